@@ -6,16 +6,42 @@ from datetime import timedelta
 import time
 import logging
 
-from .thunderboard_ble import ThunderboardBluetoothDeviceData, ThunderboardDevice
+from .thunderboard_ble import (
+    ALL_LEDS_MODE,
+    ThunderboardAdaptiveInterval,
+    ThunderboardBluetoothDeviceData,
+    ThunderboardCircuitBreaker,
+    ThunderboardConnectionPool,
+    ThunderboardDevice,
+    ThunderboardLightsGroup,
+    ThunderboardLightsState,
+    ThunderboardEnergyBudget,
+    ThunderboardImuStream,
+    ThunderboardVibrationFeatures,
+    ThunderboardPollScheduler,
+    ThunderboardPresenceTracker,
+    ThunderboardPublishFilter,
+    ThunderboardReconnectSupervisor,
+)
+from .thunderboard_ble.pool import get_adapter
 
 from bleak import BleakClient
 from bleak_retry_connector import establish_connection
-from homeassistant.components.bluetooth import async_ble_device_from_address
+from homeassistant.components.bluetooth import (
+    async_ble_device_from_address,
+    async_last_service_info,
+    async_scanner_devices_by_address,
+)
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+
+from .coordinator import ThunderboardDataUpdateCoordinator
+from .storage import ThunderboardDeviceStore
 
 from .const import (
     DEFAULT_SCAN_INTERVAL, 
@@ -31,7 +57,38 @@ from .const import (
     ADD_BLE_CALLBACK,
     ADD_BLE_CALLBACK_KEY,
     EVENT_DEBOUNCE_TIME_KEY,
-    EVENT_DEBOUNCE_TIME
+    EVENT_DEBOUNCE_TIME,
+    PASSIVE_MODE_KEY,
+    PASSIVE_MODE,
+    PASSIVE_FALLBACK_INTERVAL,
+    PUBLISH_FILTER_KEY,
+    PUBLISH_FILTER,
+    ADAPTIVE_INTERVAL_KEY,
+    ADAPTIVE_INTERVAL,
+    MAX_SCAN_INTERVAL_KEY,
+    MAX_SCAN_INTERVAL,
+    BATTERY_LIFETIME_KEY,
+    BATTERY_LIFETIME,
+    MIN_SIGNAL_STRENGTH_KEY,
+    MIN_SIGNAL_STRENGTH,
+    IMU_PUBLISH_INTERVAL_KEY,
+    IMU_PUBLISH_INTERVAL,
+    CONNECTION_POOL_KEY,
+    POOL_MAX_CONNECTIONS,
+    POOL_IDLE_TIMEOUT,
+    POOL_ACQUIRE_TIMEOUT,
+    POLL_SCHEDULER_KEY,
+    ADAPTER_CONNECTION_SLOTS,
+    DEVICE_INFO_STORE_KEY,
+    DEVICE_INFO_STORAGE_KEY,
+    HANDLE_MAP_STORE_KEY,
+    HANDLE_MAP_STORAGE_KEY,
+    SERVICE_REFRESH_DEVICE_INFO,
+    SERVICE_SET_LIGHTS,
+    LIGHTS_GROUP_KEY,
+    PRESENCE_SAMPLE_INTERVAL,
+    STALE_CHECK_INTERVAL,
+    STALE_VALUE_INTERVALS,
     )
 
 from homeassistant.components.bluetooth.api import async_register_callback
@@ -42,8 +99,6 @@ PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.LIGHT]
 
 _LOGGER = logging.getLogger(__name__)
 
-last_event_time = time.time()
-
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Thunderboard BLE device from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -52,85 +107,421 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     _LOGGER.debug("Thunderboard device address %s", address)
-    thunderboard = ThunderboardBluetoothDeviceData(_LOGGER)
+    pool = get_connection_pool(hass)
+    scheduler = get_poll_scheduler(hass)
+    device_info_store = await async_get_device_store(hass, DEVICE_INFO_STORE_KEY, DEVICE_INFO_STORAGE_KEY)
+    handle_map_store = await async_get_device_store(hass, HANDLE_MAP_STORE_KEY, HANDLE_MAP_STORAGE_KEY)
+    device_info = device_info_store.get(address)
+    # The handles are only valid for the firmware they were resolved with
+    handle_map = None
+    if device_info and (stored := handle_map_store.get(address)):
+        if stored.get("sw_version") == device_info.get("sw_version"):
+            handle_map = stored.get("handles")
+    thunderboard = ThunderboardBluetoothDeviceData(
+        _LOGGER,
+        pool=pool,
+        device_info=device_info,
+        handle_map=handle_map,
+        min_rssi=entry.options.get(MIN_SIGNAL_STRENGTH_KEY, MIN_SIGNAL_STRENGTH),
+    )
+    if device_info:
+        # Known device, register it without waiting for the first connection
+        dr.async_get(hass).async_get_or_create(
+            config_entry_id=entry.entry_id,
+            connections={(dr.CONNECTION_BLUETOOTH, address)},
+            name=device_info.get("name") or None,
+            model=device_info.get("model"),
+            hw_version=device_info.get("hw_version"),
+            sw_version=device_info.get("sw_version"),
+        )
     scan_interval = entry.options.get(SCAN_INTERVAL_KEY, DEFAULT_SCAN_INTERVAL)
     scan_timeout = entry.options.get(SCAN_TIMEOUT_KEY, SCAN_TIMEOUT)
     max_attempts = entry.options.get(MAX_CONNECTION_ATTEMPTS_KEY, MAX_CONNECTION_ATTEMPTS)
     event_debounce_time = entry.options.get(EVENT_DEBOUNCE_TIME_KEY, EVENT_DEBOUNCE_TIME)
     keep_connect = entry.options.get(KEEP_DEVICE_CONNECTED_KEY, KEEP_DEVICE_CONNECTED)
+    passive_mode = entry.options.get(PASSIVE_MODE_KEY, PASSIVE_MODE)
+    if passive_mode:
+        # Notifications and lights need a connection, passive mode never keeps one
+        keep_connect = False
+    adaptive_interval = None
+    if entry.options.get(ADAPTIVE_INTERVAL_KEY, ADAPTIVE_INTERVAL) and not passive_mode:
+        # The polling interval option is the fastest the adaptive interval can poll
+        adaptive_interval = ThunderboardAdaptiveInterval(
+            scan_interval, entry.options.get(MAX_SCAN_INTERVAL_KEY, MAX_SCAN_INTERVAL)
+        )
+    energy_budget = None
+    if (battery_lifetime := entry.options.get(BATTERY_LIFETIME_KEY, BATTERY_LIFETIME)) and not passive_mode:
+        energy_budget = ThunderboardEnergyBudget(battery_lifetime, scan_interval)
+    last_connect_time = None
+    add_ble_callback = entry.options.get(ADD_BLE_CALLBACK_KEY, ADD_BLE_CALLBACK)
+    # Learns when the board advertises, the connections are made while it's awake
+    presence = ThunderboardPresenceTracker()
+    # Stops connecting to a board out of range, until it advertises again or a probe succeeds
+    breaker = ThunderboardCircuitBreaker()
+    last_advertisement_time = None
+    # Time of the last advertisement seen by each adapter or proxy, its RSSI is smoothed once per advertisement
+    last_source_times: dict[str, float] = {}
+
+    def _record_signal(rssi: int | None, source: str, seen_at: float) -> None:
+        if last_source_times.get(source) != seen_at:
+            last_source_times[source] = seen_at
+            thunderboard.signal.record(rssi, source, seen_at)
+
+    @callback
+    def _async_sample_advertisements(*args) -> None:
+        """Record the last advertisements seen, the callbacks are not called for the unchanged ones."""
+        nonlocal last_advertisement_time
+        service_info = async_last_service_info(hass, address, connectable=False)
+        if service_info is not None and service_info.time != last_advertisement_time:
+            last_advertisement_time = service_info.time
+            presence.record_advertisement(service_info.time)
+            breaker.record_advertisement(service_info.time)
+            _record_signal(service_info.rssi, service_info.source, service_info.time)
+        # The other adapters and proxies that see the board
+        for scanner_device in async_scanner_devices_by_address(hass, address, connectable=False):
+            scanner = scanner_device.scanner
+            if (seen_at := getattr(scanner, "discovered_device_timestamps", {}).get(address)) is not None:
+                _record_signal(scanner_device.advertisement.rssi, scanner.source, seen_at)
+
+    _async_sample_advertisements()
+    # A board advertising faster than the samples is seen with a longer interval, which only widens its wake window
+    entry.async_on_unload(
+        async_track_time_interval(hass, _async_sample_advertisements, timedelta(seconds=PRESENCE_SAMPLE_INTERVAL))
+    )
+
+    async def _async_reconnect() -> None:
+        if not _should_keep_connect():
+            # The battery budget no longer keeps the connection
+            return
+        # The poll connects, subscribes again to the notifications and reads the state
+        await coordinator.async_refresh()
+        if not thunderboard.session.connected:
+            raise UpdateFailed(f"Unable to reconnect to Thunderboard device {address}")
+
+    # Reconnects when the kept connection is lost, instead of waiting for the next poll
+    supervisor = None
+    if keep_connect:
+        supervisor = ThunderboardReconnectSupervisor(_async_reconnect, _LOGGER)
+        thunderboard.disconnected_callback = supervisor.handle_disconnect
+        entry.async_on_unload(supervisor.stop)
+
+    # The IMU streams over the kept connection, only its aggregates are published
+    imu = None
+    imu_publish_interval = entry.options.get(IMU_PUBLISH_INTERVAL_KEY, IMU_PUBLISH_INTERVAL)
+    features = None
+    if imu_publish_interval > 0 and keep_connect:
+        imu = ThunderboardImuStream()
+        # Vibration and tilt features need NumPy, without it only the aggregates are published
+        if ThunderboardVibrationFeatures.is_available():
+            features = ThunderboardVibrationFeatures()
+        else:
+            _LOGGER.debug("NumPy is not installed, the vibration features are disabled")
+
+    def _should_keep_connect() -> bool:
+        # On battery the budget can ask to disconnect between the polls
+        return keep_connect and (energy_budget is None or energy_budget.plan.keep_connect)
+
+    async def _async_update_polling_interval(data: ThunderboardDevice, connects: int) -> None:
+        if getattr(data, "error", None) or (adaptive_interval is None and energy_budget is None):
+            return
+        interval = adaptive_interval.update(data) if adaptive_interval is not None else scan_interval
+        if energy_budget is not None:
+            plan = energy_budget.update(data, thunderboard.last_read_count, connects, keep_connect)
+            # The battery budget is a floor, the adaptive interval can only poll less often
+            interval = max(interval, plan.interval)
+            if plan.on_battery and not plan.keep_connect:
+                # Don't let the pool keep an idle connection open on battery
+                await pool.remove(address)
+        if adaptive_interval is not None:
+            # The values tracked are read on every poll once the interval is shorter than their refresh policy,
+            # half the interval as a poll reads them a bit after it starts
+            thunderboard.refresh_schedule.cap_max_age(adaptive_interval.steps, interval / 2)
+        coordinator.polling_interval = interval
+        scheduler.set_interval(address, interval)
+
+    def _record_connection(success: bool) -> None:
+        state = breaker.state
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if breaker.state != state:
+            _LOGGER.warning("Connections to Thunderboard device %s changed from %s to %s", address, state, breaker.state)
 
     async def _async_update_method():
         """Get data from Thunderboard BLE."""
+        nonlocal last_connect_time
         _LOGGER.debug("Thunderboard update method.")
-        ble_device = async_ble_device_from_address(hass, address)
+        if passive_mode and last_connect_time is not None:
+            missing = thunderboard.keys_not_advertised
+            if not missing or time.monotonic() - last_connect_time < PASSIVE_FALLBACK_INTERVAL:
+                return coordinator.filter_data(thunderboard.device)
+            _LOGGER.debug("Connecting for the values not advertised: %s", missing)
+        ble_device = get_best_ble_device(hass, address, thunderboard)
         if not ble_device:
             raise ConfigEntryNotReady(
                 f"Could not find Thunderboard device with address {address}"
             )
         _LOGGER.debug("Thunderboard BLE device is %s", ble_device)
+        # A connected board stops advertising, it's awake and present as long as the connection is up
+        if not thunderboard.session.connected and not await presence.wait_awake():
+            if presence.is_present() and coordinator.data is not None:
+                _LOGGER.debug("Thunderboard device %s is not advertising, keeping the last values", address)
+                return coordinator.data
+            raise UpdateFailed(f"Thunderboard device {address} is not advertising")
+        if not thunderboard.session.connected and not thunderboard.signal.should_connect():
+            # A marginal link would hold the adapter for the whole connection timeout
+            _LOGGER.debug("Signal of Thunderboard device %s is too weak to connect: %s", address, thunderboard.signal.stats)
+            if coordinator.data is not None and last_connect_time is not None and (
+                time.monotonic() - last_connect_time < coordinator.polling_interval * STALE_VALUE_INTERVALS
+            ):
+                return coordinator.data
+            raise UpdateFailed(f"Signal of Thunderboard device {address} is too weak to connect")
+        if not breaker.allow_request():
+            _LOGGER.debug("Connections to Thunderboard device %s are stopped: %s", address, breaker.stats)
+            if presence.is_present() and coordinator.data is not None:
+                return coordinator.data
+            raise UpdateFailed(f"Thunderboard device {address} is unreachable, connections are stopped")
         
         try:
-            data = await thunderboard.update_device(ble_device, keep_connect, scan_timeout, max_attempts)
+            # The connection timeout starts once the adapter has a free slot. Inside it the pool evicts an idle
+            # connection, kept alive or not, and only waits up to its acquire timeout for a leased one to be released.
+            connects = thunderboard.connects
+            failures = thunderboard.connect_stats["failures"]
+            async with scheduler.slot(address, get_adapter(ble_device)):
+                data = await thunderboard.update_device(ble_device, _should_keep_connect(), scan_timeout, max_attempts)
         except Exception as err:
+            _record_connection(False)
             raise UpdateFailed(f"Unable to fetch data: {err}") from err
+        _record_connection(thunderboard.connect_stats["failures"] == failures)
+        last_connect_time = time.monotonic()
+        await _async_update_polling_interval(data, thunderboard.connects - connects)
 
-        return data
+        device_info_store.async_set(address, thunderboard.device_info)
+        if thunderboard.device_info and thunderboard.handle_map:
+            handle_map_store.async_set(address, {
+                "sw_version": thunderboard.device_info.get("sw_version"),
+                "handles": thunderboard.handle_map,
+            })
+        return coordinator.filter_data(data)
 
 
     _LOGGER.debug("Polling interval is set to: %s seconds", scan_interval)
+    # The shared scheduler polls the device, not a timer of the coordinator
 
     coordinator = hass.data.setdefault(DOMAIN, {})[
         entry.entry_id
-    ] = DataUpdateCoordinator(
+    ] = ThunderboardDataUpdateCoordinator(
         hass,
         _LOGGER,
-        name=DOMAIN,
+        thunderboard,
         update_method=_async_update_method,
-        update_interval=timedelta(seconds=scan_interval),
+        update_interval=None,
+        polling_interval=scan_interval,
+        adaptive_interval=adaptive_interval,
+        energy_budget=energy_budget,
+        presence=presence,
+        breaker=breaker,
+        supervisor=supervisor,
+        imu=imu,
+        features=features,
+        # In passive mode the values not advertised are read once per fallback interval
+        min_value_age=max(PASSIVE_FALLBACK_INTERVAL if passive_mode else 0, imu_publish_interval if imu else 0),
+        publish_filter=ThunderboardPublishFilter() if entry.options.get(PUBLISH_FILTER_KEY, PUBLISH_FILTER) else None,
     )
 
     await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(
+        async_track_time_interval(hass, coordinator.async_check_stale_values, timedelta(seconds=STALE_CHECK_INTERVAL))
+    )
+    entry.async_on_unload(scheduler.register(address, coordinator.polling_interval, coordinator.async_refresh))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Define and register an Bluetooth event callback to update the data when device start to advertise again
     def async_handle_bluetooth_event(service_info: BluetoothServiceInfoBleak, change: BluetoothChange) -> None:
         """Handle a Bluetooth event."""
-        global last_event_time
         _LOGGER.debug("BLE event received: %s, change %s", service_info, change)
-        time_difference = time.time() - last_event_time
+        _async_sample_advertisements()
+        _record_signal(service_info.rssi, service_info.source, service_info.time)
+        # Check if user don't want to refresh on advertisements
+        if not add_ble_callback:
+            return
         # Do not require data update if is faster than defined event debounce time
-        if time_difference > event_debounce_time:
+        if presence.should_request_refresh(event_debounce_time):
             # Refresh data when device advertising is detected
             _LOGGER.debug("Require coordinator to update the data")
             loop = asyncio.get_running_loop()
             loop.create_task(coordinator.async_request_refresh())
-            last_event_time = time.time()
         else:
-            _LOGGER.debug("Don't request data due to time difference: %d < %d", time_difference, event_debounce_time)
+            _LOGGER.debug("Don't request data faster than the debounce time of %d seconds", event_debounce_time)
 
-    # Check if user don't want to register an callback
-    if entry.options.get(ADD_BLE_CALLBACK_KEY, ADD_BLE_CALLBACK):
+    def async_handle_passive_bluetooth_event(service_info: BluetoothServiceInfoBleak, change: BluetoothChange) -> None:
+        """Decode the values in the advertisement, without connecting."""
+        _async_sample_advertisements()
+        data = thunderboard.update_from_advertisement(
+            address, service_info.service_data, service_info.rssi, service_info.source
+        )
+        coordinator.async_publish_data(data)
+
+    if passive_mode:
+        _LOGGER.debug("Registering passive BLE callback")
+        entry.async_on_unload(
+            async_register_callback(
+                hass,
+                async_handle_passive_bluetooth_event,
+                BluetoothCallbackMatcher(address=address),
+                BluetoothScanningMode.PASSIVE,
+            )
+        )
+    else:
+        # Registered even without refreshes on advertisements, to learn when the board is awake
         _LOGGER.debug("Registering BLE callback")
-        async_register_callback(
-            hass,
-            async_handle_bluetooth_event,
-            BluetoothCallbackMatcher(address=address),
-            BluetoothScanningMode.PASSIVE,
+        entry.async_on_unload(
+            async_register_callback(
+                hass,
+                async_handle_bluetooth_event,
+                BluetoothCallbackMatcher(address=address),
+                BluetoothScanningMode.PASSIVE,
+            )
         )
 
     def notification_callback(sender: int, payload: bytearray):
         """Handle notification data from the device."""
-        data = thunderboard.get_updated_buttons_state(payload)
-        coordinator.async_set_updated_data(data)
+        data = thunderboard.get_updated_state(sender, payload)
+        coordinator.async_publish_data(data)
         _LOGGER.debug(f"Received notification from {sender}: {data}")
 
-    if keep_connect:
+    # A running LED effect would keep writing frames after the entry is unloaded
+    entry.async_on_unload(thunderboard.session.lights_controller().stop_effect)
+
+    if _should_keep_connect():
         _LOGGER.debug(f"Enable notification on buttons press")
-        await thunderboard.notification_on_buttons_press(notification_callback)
+        async with scheduler.slot(address):
+            await thunderboard.notification_on_buttons_press(notification_callback)
+            if imu is not None:
+                _LOGGER.debug("Enable the IMU stream, published every %d seconds", imu_publish_interval)
+                await thunderboard.start_imu(imu)
+
+    async def _async_publish_imu(*args) -> None:
+        aggregates = imu.aggregate()
+        if features is not None:
+            # The windows are computed in the executor, the event loop only copies the samples
+            aggregates.update(await features.process(imu))
+        if aggregates:
+            coordinator.async_publish_data(thunderboard.update_from_aggregates(aggregates))
+
+    if imu is not None:
+        entry.async_on_unload(
+            async_track_time_interval(hass, _async_publish_imu, timedelta(seconds=imu_publish_interval))
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_REFRESH_DEVICE_INFO):
+        hass.services.async_register(DOMAIN, SERVICE_REFRESH_DEVICE_INFO, _async_refresh_device_info)
+    if not hass.services.has_service(DOMAIN, SERVICE_SET_LIGHTS):
+        hass.services.async_register(
+            DOMAIN, SERVICE_SET_LIGHTS, _async_set_lights, supports_response=SupportsResponse.OPTIONAL
+        )
 
     return True
 
+async def _async_refresh_device_info(call: ServiceCall) -> None:
+    """Read again the device information on the next update, for one or all devices."""
+    address = call.data.get("address")
+    for coordinator in list(call.hass.data.get(DOMAIN, {}).values()):
+        if not isinstance(coordinator, ThunderboardDataUpdateCoordinator):
+            continue
+        if address and coordinator.config_entry.unique_id != address:
+            continue
+        coordinator.thunderboard.invalidate_device_info()
+        await coordinator.async_request_refresh()
+
+async def _async_set_lights(call: ServiceCall) -> ServiceResponse:
+    """Set the same lights state on many devices at once, return the seconds each device took."""
+    addresses = call.data.get("address")
+    if isinstance(addresses, str):
+        addresses = [addresses]
+    coordinators = {
+        coordinator.config_entry.unique_id: coordinator
+        for coordinator in call.hass.data.get(DOMAIN, {}).values()
+        if isinstance(coordinator, ThunderboardDataUpdateCoordinator)
+        and (addresses and coordinator.config_entry.unique_id in addresses or not addresses and coordinator.thunderboard.session.connected)
+    }
+    state = ThunderboardLightsState(
+        rgb=tuple(call.data.get("rgb_color", (255, 255, 255))),
+        mode=ALL_LEDS_MODE if call.data.get("turn_on", True) else 0,
+        brightness=call.data.get("brightness", 255),
+    )
+    timings = await get_lights_group(call.hass).set_state(
+        {address: coordinator.thunderboard.session.lights_controller() for address, coordinator in coordinators.items()},
+        state,
+    )
+    for address, coordinator in coordinators.items():
+        if timings.get(address) is not None and coordinator.data is not None:
+            coordinator.data.lights = coordinator.thunderboard.session.lights_controller().state
+            coordinator.async_set_updated_data(coordinator.data)
+    return {"timings": timings, "skew": get_lights_group(call.hass).skew} if call.return_response else None
+
+async def async_get_device_store(hass: HomeAssistant, data_key: str, storage_key: str) -> ThunderboardDeviceStore:
+    """Get a loaded device store shared by all Thunderboard entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if data_key not in domain_data:
+        domain_data[data_key] = ThunderboardDeviceStore(hass, storage_key)
+    store = domain_data[data_key]
+    await store.async_load()
+    return store
+
+def get_connection_pool(hass: HomeAssistant) -> ThunderboardConnectionPool:
+    """Get the connection pool shared by all Thunderboard entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if CONNECTION_POOL_KEY not in domain_data:
+        pool = domain_data[CONNECTION_POOL_KEY] = ThunderboardConnectionPool(
+            _LOGGER,
+            max_connections=POOL_MAX_CONNECTIONS,
+            idle_timeout=POOL_IDLE_TIMEOUT,
+            acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+        )
+
+        async def _async_expire_idle_connections(*args) -> None:
+            await pool.expire_idle()
+            _LOGGER.debug("Connection pool stats: %s", pool.stats)
+
+        # One timer for the pool, it lives as long as Home Assistant like the pool
+        async_track_time_interval(hass, _async_expire_idle_connections, timedelta(seconds=POOL_IDLE_TIMEOUT))
+    return domain_data[CONNECTION_POOL_KEY]
+
+def get_poll_scheduler(hass: HomeAssistant) -> ThunderboardPollScheduler:
+    """Get the polling scheduler shared by all Thunderboard entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if POLL_SCHEDULER_KEY not in domain_data:
+        domain_data[POLL_SCHEDULER_KEY] = ThunderboardPollScheduler(
+            _LOGGER,
+            adapter_slots=ADAPTER_CONNECTION_SLOTS,
+            # Tracked by Home Assistant, cancelled on shutdown
+            create_task=hass.async_create_background_task,
+        )
+    return domain_data[POLL_SCHEDULER_KEY]
+
+def get_best_ble_device(hass: HomeAssistant, address: str, thunderboard: ThunderboardBluetoothDeviceData):
+    """Get the device through the connectable adapter or proxy with the best smoothed signal."""
+    scanner_devices = async_scanner_devices_by_address(hass, address, connectable=True)
+    if not scanner_devices:
+        return async_ble_device_from_address(hass, address)
+    best = max(
+        scanner_devices,
+        key=lambda scanner_device: thunderboard.signal.get_rssi(
+            scanner_device.scanner.source, scanner_device.advertisement.rssi
+        ),
+    )
+    return best.ble_device
+
+def get_lights_group(hass: HomeAssistant) -> ThunderboardLightsGroup:
+    """Get the lights group command shared by all Thunderboard entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if LIGHTS_GROUP_KEY not in domain_data:
+        domain_data[LIGHTS_GROUP_KEY] = ThunderboardLightsGroup(_LOGGER)
+    return domain_data[LIGHTS_GROUP_KEY]
+
 # Reload entry when options are updated
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry)-> None:
     """Handle options update."""
@@ -142,6 +533,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        # Drop the pooled connection, the next setup subscribes again to notifications
+        await get_connection_pool(hass).remove(entry.unique_id)
 
     return unload_ok
 
@@ -150,6 +543,9 @@ async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     address = entry.unique_id
     assert address is not None
+    await get_connection_pool(hass).remove(address)
+    (await async_get_device_store(hass, DEVICE_INFO_STORE_KEY, DEVICE_INFO_STORAGE_KEY)).async_remove(address)
+    (await async_get_device_store(hass, HANDLE_MAP_STORE_KEY, HANDLE_MAP_STORAGE_KEY)).async_remove(address)
     ble_device = async_ble_device_from_address(hass, address)
     client = await establish_connection(BleakClient, ble_device, ble_device.address)
     await client.disconnect()
\ No newline at end of file
@@ -33,7 +33,21 @@ from .const import (
     ADD_BLE_CALLBACK_KEY,
     ADD_BLE_CALLBACK,
     EVENT_DEBOUNCE_TIME_KEY,
-    EVENT_DEBOUNCE_TIME
+    EVENT_DEBOUNCE_TIME,
+    PASSIVE_MODE_KEY,
+    PASSIVE_MODE,
+    PUBLISH_FILTER_KEY,
+    PUBLISH_FILTER,
+    ADAPTIVE_INTERVAL_KEY,
+    ADAPTIVE_INTERVAL,
+    MAX_SCAN_INTERVAL_KEY,
+    MAX_SCAN_INTERVAL,
+    BATTERY_LIFETIME_KEY,
+    BATTERY_LIFETIME,
+    MIN_SIGNAL_STRENGTH_KEY,
+    MIN_SIGNAL_STRENGTH,
+    IMU_PUBLISH_INTERVAL_KEY,
+    IMU_PUBLISH_INTERVAL,
     )
 
 _LOGGER = logging.getLogger(__name__)
@@ -218,7 +232,35 @@ def options_schema(
         vol.Required(
             EVENT_DEBOUNCE_TIME_KEY,
             default=options.get(EVENT_DEBOUNCE_TIME_KEY, EVENT_DEBOUNCE_TIME),
-        ): int
+        ): int,
+        vol.Required(
+            PASSIVE_MODE_KEY,
+            default=options.get(PASSIVE_MODE_KEY, PASSIVE_MODE),
+        ): bool,
+        vol.Required(
+            PUBLISH_FILTER_KEY,
+            default=options.get(PUBLISH_FILTER_KEY, PUBLISH_FILTER),
+        ): bool,
+        vol.Required(
+            ADAPTIVE_INTERVAL_KEY,
+            default=options.get(ADAPTIVE_INTERVAL_KEY, ADAPTIVE_INTERVAL),
+        ): bool,
+        vol.Required(
+            MAX_SCAN_INTERVAL_KEY,
+            default=options.get(MAX_SCAN_INTERVAL_KEY, MAX_SCAN_INTERVAL),
+        ): int,
+        vol.Required(
+            BATTERY_LIFETIME_KEY,
+            default=options.get(BATTERY_LIFETIME_KEY, BATTERY_LIFETIME),
+        ): int,
+        vol.Required(
+            MIN_SIGNAL_STRENGTH_KEY,
+            default=options.get(MIN_SIGNAL_STRENGTH_KEY, MIN_SIGNAL_STRENGTH),
+        ): int,
+        vol.Required(
+            IMU_PUBLISH_INTERVAL_KEY,
+            default=options.get(IMU_PUBLISH_INTERVAL_KEY, IMU_PUBLISH_INTERVAL),
+        ): int,
     }
 
 def new_options(
@@ -227,7 +269,14 @@ def new_options(
     scan_timeout: int, 
     max_connection_attempts: int,
     add_ble_callback: bool,
-    event_debounce_time: int
+    event_debounce_time: int,
+    passive_mode: bool,
+    publish_filter: bool,
+    adaptive_interval: bool,
+    max_scan_interval: int,
+    battery_lifetime: int,
+    min_signal_strength: int,
+    imu_publish_interval: int,
 ) -> dict[str, list[int]]:
     """Create a standard options object."""
     return {
@@ -236,7 +285,14 @@ def new_options(
         SCAN_TIMEOUT_KEY: scan_timeout,
         MAX_CONNECTION_ATTEMPTS_KEY: max_connection_attempts,
         ADD_BLE_CALLBACK_KEY: add_ble_callback,
-        EVENT_DEBOUNCE_TIME_KEY: event_debounce_time
+        EVENT_DEBOUNCE_TIME_KEY: event_debounce_time,
+        PASSIVE_MODE_KEY: passive_mode,
+        PUBLISH_FILTER_KEY: publish_filter,
+        ADAPTIVE_INTERVAL_KEY: adaptive_interval,
+        MAX_SCAN_INTERVAL_KEY: max_scan_interval,
+        BATTERY_LIFETIME_KEY: battery_lifetime,
+        MIN_SIGNAL_STRENGTH_KEY: min_signal_strength,
+        IMU_PUBLISH_INTERVAL_KEY: imu_publish_interval,
     }
 
 def options_data(user_input: dict[str, str]) -> dict[str, list[int]]:
@@ -247,7 +303,14 @@ def options_data(user_input: dict[str, str]) -> dict[str, list[int]]:
         user_input.get(SCAN_TIMEOUT_KEY),
         user_input.get(MAX_CONNECTION_ATTEMPTS_KEY),
         user_input.get(ADD_BLE_CALLBACK_KEY),
-        user_input.get(EVENT_DEBOUNCE_TIME_KEY)
+        user_input.get(EVENT_DEBOUNCE_TIME_KEY),
+        user_input.get(PASSIVE_MODE_KEY),
+        user_input.get(PUBLISH_FILTER_KEY),
+        user_input.get(ADAPTIVE_INTERVAL_KEY),
+        user_input.get(MAX_SCAN_INTERVAL_KEY),
+        user_input.get(BATTERY_LIFETIME_KEY),
+        user_input.get(MIN_SIGNAL_STRENGTH_KEY),
+        user_input.get(IMU_PUBLISH_INTERVAL_KEY),
     )
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
@@ -5,14 +5,60 @@ DOMAIN = "thunderboard"
 DEFAULT_SCAN_INTERVAL = 20
 MFCT_ID = 71
 MAGNETIC_STRENGTH_UNIT = "uT"
+ACCELERATION_UNIT = "g"
 SCAN_INTERVAL_KEY = "scan_interval"
 KEEP_DEVICE_CONNECTED_KEY = "keep_device_connected"
 SCAN_TIMEOUT_KEY = "scan_timeout"
 MAX_CONNECTION_ATTEMPTS_KEY = "max_connection_attempts"
 ADD_BLE_CALLBACK_KEY = "add_ble_callback"
 EVENT_DEBOUNCE_TIME_KEY = "event_debounce_time"
+PASSIVE_MODE_KEY = "passive_mode"
+PUBLISH_FILTER_KEY = "publish_filter"
+ADAPTIVE_INTERVAL_KEY = "adaptive_interval"
+MAX_SCAN_INTERVAL_KEY = "max_scan_interval"
+BATTERY_LIFETIME_KEY = "battery_lifetime"
+MIN_SIGNAL_STRENGTH_KEY = "min_signal_strength"
+IMU_PUBLISH_INTERVAL_KEY = "imu_publish_interval"
 ADD_BLE_CALLBACK = True
 KEEP_DEVICE_CONNECTED = True
 SCAN_TIMEOUT = 30.0
 MAX_CONNECTION_ATTEMPTS = 3
-EVENT_DEBOUNCE_TIME = 10
\ No newline at end of file
+EVENT_DEBOUNCE_TIME = 10
+PASSIVE_MODE = False
+PUBLISH_FILTER = True
+ADAPTIVE_INTERVAL = False
+MAX_SCAN_INTERVAL = 300
+# Target battery lifetime in days, 0 disables the battery budget
+BATTERY_LIFETIME = 0
+# Smoothed RSSI in dBm below which the connections are skipped, -127 disables the floor
+MIN_SIGNAL_STRENGTH = -95
+# Seconds between two IMU aggregates, 0 disables the IMU stream
+IMU_PUBLISH_INTERVAL = 0
+# A value not read again for this many polling intervals, or refresh periods when longer, is unavailable
+STALE_VALUE_INTERVALS = 3
+STALE_CHECK_INTERVAL = 60
+# Seconds between two samples of the last advertisement of a board, to learn when it's awake
+PRESENCE_SAMPLE_INTERVAL = 1
+# In passive mode, how often to connect for the values that are not advertised
+PASSIVE_FALLBACK_INTERVAL = 3600
+# Connection pool shared by all the entries
+CONNECTION_POOL_KEY = "connection_pool"
+# Connections open at the same time through each adapter or proxy
+POOL_MAX_CONNECTIONS = 5
+# Seconds a connection released without keep alive, by a stream or a light, stays open for the next user
+POOL_IDLE_TIMEOUT = 60
+# Seconds a poll waits for a free connection slot before failing
+POOL_ACQUIRE_TIMEOUT = 30
+# Polling scheduler shared by all the entries
+POLL_SCHEDULER_KEY = "poll_scheduler"
+ADAPTER_CONNECTION_SLOTS = 2
+# Device information and GATT handles cache
+DEVICE_INFO_STORE_KEY = "device_info_store"
+DEVICE_INFO_STORAGE_KEY = f"{DOMAIN}.device_info"
+HANDLE_MAP_STORE_KEY = "handle_map_store"
+HANDLE_MAP_STORAGE_KEY = f"{DOMAIN}.handle_map"
+DEVICE_STORAGE_VERSION = 1
+SERVICE_REFRESH_DEVICE_INFO = "refresh_device_info"
+SERVICE_SET_LIGHTS = "set_lights"
+# Light commands sent to many boards at once, shared by all the entries
+LIGHTS_GROUP_KEY = "lights_group"
@@ -0,0 +1,130 @@
+"""Data update coordinator for Thunderboard devices."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .thunderboard_ble import (
+    ThunderboardAdaptiveInterval,
+    ThunderboardBluetoothDeviceData,
+    ThunderboardCircuitBreaker,
+    ThunderboardDevice,
+    ThunderboardEnergyBudget,
+    ThunderboardImuStream,
+    ThunderboardKeyDispatcher,
+    ThunderboardPresenceTracker,
+    ThunderboardPublishFilter,
+    ThunderboardReconnectSupervisor,
+    ThunderboardVibrationFeatures,
+)
+
+from .const import DOMAIN, STALE_VALUE_INTERVALS
+
+
+class ThunderboardDataUpdateCoordinator(DataUpdateCoordinator[ThunderboardDevice]):
+    """Coordinate the updates of a Thunderboard device and give access to its session."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        thunderboard: ThunderboardBluetoothDeviceData,
+        update_method: Callable[[], Awaitable[ThunderboardDevice]],
+        update_interval: timedelta,
+        publish_filter: ThunderboardPublishFilter | None = None,
+        polling_interval: float | None = None,
+        adaptive_interval: ThunderboardAdaptiveInterval | None = None,
+        energy_budget: ThunderboardEnergyBudget | None = None,
+        presence: ThunderboardPresenceTracker | None = None,
+        breaker: ThunderboardCircuitBreaker | None = None,
+        supervisor: ThunderboardReconnectSupervisor | None = None,
+        imu: ThunderboardImuStream | None = None,
+        features: ThunderboardVibrationFeatures | None = None,
+        min_value_age: float = 0,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            logger,
+            name=DOMAIN,
+            update_method=update_method,
+            update_interval=update_interval,
+            # The filtered data is the same object when nothing passed, don't notify the entities then.
+            # Without a filter the device is updated in place, so it's always different from the last data.
+            always_update=publish_filter is None,
+        )
+        self.thunderboard = thunderboard
+        self.publish_filter = publish_filter
+        # Seconds between the polls of the scheduler, changed by the adaptive interval
+        self.polling_interval = polling_interval
+        self.adaptive_interval = adaptive_interval
+        self.energy_budget = energy_budget
+        self.presence = presence
+        self.breaker = breaker
+        self.supervisor = supervisor
+        self.imu = imu
+        self.features = features
+        # The entities listen with their key as context, only the ones of the changed keys are updated
+        self.dispatcher = ThunderboardKeyDispatcher()
+        self._last_dispatch_success: bool | None = None
+        # Shortest age before a value is unavailable, for values updated less often than the polls
+        self.min_value_age = min_value_age
+        # Keys whose value was not read again for too long, their entities are unavailable
+        self.stale_keys: set[str] = set()
+
+    def get_max_age(self, key: str) -> float | None:
+        """Seconds after its last read when a value is unavailable, None when it never is."""
+        max_age = self.thunderboard.refresh_schedule.get_max_age(key)
+        if max_age is None:
+            return None
+        return max(max_age, self.polling_interval or 0, self.min_value_age) * STALE_VALUE_INTERVALS
+
+    def _update_stale_keys(self, now: float | None = None) -> set[str]:
+        """Update the stale keys, return the ones that became stale or fresh again."""
+        device = self.thunderboard.device
+        if device is None:
+            return set()
+        now = time.time() if now is None else now
+        # The raw device has the time of the last read, the filtered one only of the last published value
+        stale = {
+            key for key, timestamp in device.timestamps.items()
+            if (max_age := self.get_max_age(key)) is not None and now - timestamp > max_age
+        }
+        changed = stale ^ self.stale_keys
+        self.stale_keys = stale
+        return changed
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the entities of the changed keys, all of them when the availability changed."""
+        broadcast = self.last_update_success != self._last_dispatch_success
+        self._last_dispatch_success = self.last_update_success
+        keys = self._update_stale_keys()
+        if self.publish_filter is not None:
+            # The heartbeat of an unchanged value updates its entities too
+            keys |= self.publish_filter.pop_republished()
+        self.dispatcher.dispatch(self.data, self._listeners.values(), broadcast, keys)
+
+    @callback
+    def async_check_stale_values(self, *args: Any) -> None:
+        """Update the entities of the values that became stale, the filtered data might not change meanwhile."""
+        if self.data is not None and (changed := self._update_stale_keys()):
+            self.dispatcher.dispatch(self.data, self._listeners.values(), keys=changed)
+
+    def filter_data(self, data: ThunderboardDevice) -> ThunderboardDevice:
+        """Get the data to publish, only with the values that passed the filter."""
+        if self.publish_filter is None:
+            return data
+        return self.publish_filter.apply(data)
+
+    @callback
+    def async_publish_data(self, data: ThunderboardDevice) -> None:
+        """Filter data pushed outside of the polling and notify the entities if anything passed."""
+        filtered = self.filter_data(data)
+        if self.publish_filter is None or filtered is not self.data:
+            self.async_set_updated_data(filtered)
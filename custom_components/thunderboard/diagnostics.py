@@ -0,0 +1,44 @@
+"""Diagnostics support for Thunderboard."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import get_connection_pool, get_lights_group, get_poll_scheduler
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "connection_pool": get_connection_pool(hass).stats,
+        # Seconds between the planned and the actual start of the last poll of this device
+        "poll_lag": get_poll_scheduler(hass).get_lag(entry.unique_id),
+        "poll_scheduler": get_poll_scheduler(hass).stats,
+        "adaptive_interval": coordinator.adaptive_interval.stats if coordinator.adaptive_interval else None,
+        "energy_budget": coordinator.energy_budget.stats if coordinator.energy_budget else None,
+        "presence": coordinator.presence.stats if coordinator.presence else None,
+        "signal": coordinator.thunderboard.signal.stats,
+        "circuit_breaker": coordinator.breaker.stats if coordinator.breaker else None,
+        "connections": coordinator.thunderboard.connect_stats,
+        "reconnections": coordinator.supervisor.stats if coordinator.supervisor else None,
+        "imu": coordinator.imu.stats if coordinator.imu else None,
+        "vibration_features": coordinator.features.stats if coordinator.features else None,
+        "updates": coordinator.thunderboard.update_stats,
+        "session": coordinator.thunderboard.session.stats,
+        "lights": coordinator.thunderboard.session.lights_controller().stats,
+        "lights_group": get_lights_group(hass).stats,
+        "dispatcher": coordinator.dispatcher.stats,
+        "publish_filter": coordinator.publish_filter.stats if coordinator.publish_filter else None,
+        # Keys that failed the last poll, their entities keep the value read before
+        "read_errors": dict(coordinator.data.errors) if coordinator.data else None,
+        "value_timestamps": dict(coordinator.data.timestamps) if coordinator.data else None,
+        "stale_values": sorted(coordinator.stale_keys),
+    }
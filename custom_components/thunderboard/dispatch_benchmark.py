@@ -0,0 +1,82 @@
+""" Benchmark of the entity callbacks per update, dispatched by key or broadcast to every entity """
+import dataclasses
+import time
+
+from thunderboard_ble.dispatch import LIGHTS_KEY, ThunderboardKeyDispatcher
+from thunderboard_ble.filters import SIGNAL_STRENGTH_KEY
+from thunderboard_ble.models import ThunderboardDevice, ThunderboardLightsState
+
+BOARDS = 30
+ROUNDS = 100
+SENSOR_KEYS = ["battery", "temperature", "humidity", "pressure", "uv_idx", "sound_level", "ambient_light", "hall_field_strenght"]
+DIGITAL_KEYS = ["power_source", "digital_state_0", "btn_0", "btn_1"]
+# One entity per key, the same as the sensor and light platforms
+ENTITY_KEYS = [*SENSOR_KEYS, *DIGITAL_KEYS, "digital_state_1", SIGNAL_STRENGTH_KEY, LIGHTS_KEY]
+
+
+def make_device() -> ThunderboardDevice:
+    return ThunderboardDevice(
+        address="00:0B:57:00:00:00",
+        name="Thunderboard",
+        model="BRD4166A",
+        sensors={key: 1.0 for key in SENSOR_KEYS},
+        digitals={key: False for key in DIGITAL_KEYS},
+        rssi=-60,
+        lights=ThunderboardLightsState(),
+    )
+
+
+def press_button(device: ThunderboardDevice, step: int) -> None:
+    device.digitals["btn_0"] = bool(step % 2)
+
+
+def poll_three_sensors(device: ThunderboardDevice, step: int) -> None:
+    for key in ("temperature", "humidity", "pressure"):
+        device.sensors[key] = float(step)
+
+
+def change_leds(device: ThunderboardDevice, step: int) -> None:
+    device.lights = dataclasses.replace(device.lights, rgb=(step % 256, 0, 0))
+
+
+def run(change, dispatch: bool) -> tuple[float, float]:
+    """ Return the callbacks per update and the seconds per update of the fleet """
+    calls = 0
+
+    def _listener() -> None:
+        nonlocal calls
+        calls += 1
+
+    boards = []
+    for _ in range(BOARDS):
+        device = make_device()
+        dispatcher = ThunderboardKeyDispatcher()
+        listeners = [(_listener, key) for key in ENTITY_KEYS]
+        # The first update reaches every entity
+        dispatcher.dispatch(device, listeners)
+        boards.append((device, dispatcher, listeners))
+
+    calls = 0
+    started = time.perf_counter()
+    for step in range(1, ROUNDS + 1):
+        for device, dispatcher, listeners in boards:
+            change(device, step)
+            dispatcher.dispatch(device, listeners, broadcast=not dispatch)
+    elapsed = time.perf_counter() - started
+    updates = ROUNDS * BOARDS
+    return calls / updates, elapsed / updates
+
+
+if __name__ == "__main__":
+    print(f"{BOARDS} boards, {len(ENTITY_KEYS)} entities each, {ROUNDS} rounds")
+    for name, change in (
+        ("button notification", press_button),
+        ("poll, 3 sensors changed", poll_three_sensors),
+        ("LED state change", change_leds),
+    ):
+        broadcast_calls, broadcast_time = run(change, dispatch=False)
+        dispatch_calls, dispatch_time = run(change, dispatch=True)
+        print(
+            f"{name}: {broadcast_calls:.1f} -> {dispatch_calls:.1f} callbacks per update, "
+            f"{broadcast_time * 1e6:.1f} -> {dispatch_time * 1e6:.1f} us per update"
+        )
@@ -0,0 +1,89 @@
+""" Benchmark of the windows per second of the IMU vibration features, batched with NumPy, one window at a time or in Python """
+import cmath
+import math
+import struct
+import time
+
+from thunderboard_ble.features import ThunderboardImuBatch, ThunderboardVibrationFeatures
+from thunderboard_ble.imu import ACCELERATION_SCALE, IMU_AXES, ThunderboardImuStream
+
+SAMPLE_RATE = 100.0
+# 1024 samples make a batch of 7 windows of 256 samples, 128 apart
+SAMPLES = 1024
+REPEATS = 200
+PYTHON_REPEATS = 3
+
+
+def make_stream() -> ThunderboardImuStream:
+    """ 0.2 g at 12.5 Hz on x over the gravity on z, and 30 degrees of beta """
+    imu = ThunderboardImuStream(SAMPLES)
+    for i in range(SAMPLES):
+        x = 0.2 * math.sin(2 * math.pi * 12.5 * i / SAMPLE_RATE)
+        imu.acceleration.push(struct.pack("<hhh", round(x / ACCELERATION_SCALE), 0, 1000), i / SAMPLE_RATE)
+    imu.orientation.push(struct.pack("<hhh", 0, 3000, 0), SAMPLES / SAMPLE_RATE)
+    return imu
+
+
+def split_windows(features: ThunderboardVibrationFeatures, batch: ThunderboardImuBatch) -> list[ThunderboardImuBatch]:
+    """ One batch per window of the batch """
+    size = IMU_AXES * 2
+    count = (len(batch.times) - features.window) // features.hop + 1
+    return [
+        ThunderboardImuBatch(
+            batch.acceleration[start * size:(start + features.window) * size],
+            batch.times[start:start + features.window],
+            batch.orientation,
+        )
+        for start in range(0, count * features.hop, features.hop)
+    ]
+
+
+def python_features(features: ThunderboardVibrationFeatures, batch: ThunderboardImuBatch) -> tuple[float, float, float]:
+    """ RMS, peak and dominant bin of the worst window, with loops and a DFT per window """
+    values = struct.unpack(f"<{len(batch.acceleration) // 2}h", batch.acceleration)
+    samples = [[value * ACCELERATION_SCALE for value in values[i::IMU_AXES]] for i in range(IMU_AXES)]
+    worst = (0.0, 0.0, 0)
+    for start in range(0, len(batch.times) - features.window + 1, features.hop):
+        axes = [axis[start:start + features.window] for axis in samples]
+        dynamic = [[value - sum(axis) / len(axis) for value in axis] for axis in axes]
+        magnitude = [math.sqrt(sum(axis[i] ** 2 for axis in dynamic)) for i in range(features.window)]
+        rms = math.sqrt(sum(value ** 2 for value in magnitude) / features.window)
+        spectrum = [
+            sum(
+                abs(sum(value * cmath.exp(-2j * math.pi * k * n / features.window) for n, value in enumerate(axis)))
+                for axis in dynamic
+            )
+            for k in range(1, features.window // 2 + 1)
+        ]
+        if rms >= worst[0]:
+            worst = (rms, max(magnitude), spectrum.index(max(spectrum)) + 1)
+    return worst
+
+
+def measure(compute, repeats: int, windows: int) -> tuple[float, float]:
+    """ Return the seconds per batch and the windows per second """
+    started = time.perf_counter()
+    for _ in range(repeats):
+        compute()
+    elapsed = (time.perf_counter() - started) / repeats
+    return elapsed, windows / elapsed
+
+
+if __name__ == "__main__":
+    features = ThunderboardVibrationFeatures()
+    batch = features.take_batch(make_stream())
+    windows = split_windows(features, batch)
+    print(f"{SAMPLES} samples at {SAMPLE_RATE:.0f} Hz, {len(windows)} windows of {features.window} samples")
+    print(f"features: {features.compute(batch)}")
+
+    def _one_window_at_a_time() -> None:
+        for window in windows:
+            features.compute(window)
+
+    for name, compute, repeats in (
+        ("batched NumPy", lambda: features.compute(batch), REPEATS),
+        ("NumPy one window at a time", _one_window_at_a_time, REPEATS),
+        ("Python loops", lambda: python_features(features, batch), PYTHON_REPEATS),
+    ):
+        elapsed, rate = measure(compute, repeats, len(windows))
+        print(f"{name}: {elapsed * 1000:.2f} ms per batch, {rate:,.0f} windows/s")
@@ -9,14 +9,15 @@ from typing import Any
 
 from .thunderboard_ble import (
     ThunderboardLights, 
+    ThunderboardLightsEffect,
     ThunderboardDevice, 
-    ThunderboardLightsController
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
+    ATTR_EFFECT,
     ATTR_RGB_COLOR,
     ColorMode,
     LightEntity,
@@ -26,18 +27,14 @@ from homeassistant.components.light import (
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.components.bluetooth import async_ble_device_from_address
 from homeassistant.helpers.device_registry import (
     CONNECTION_BLUETOOTH,
     DeviceInfo,
 )
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from bleak import BLEDevice
+from .coordinator import ThunderboardDataUpdateCoordinator
 
 from .const import (
     DOMAIN, 
@@ -58,22 +55,19 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Thunderboard BLE lights control."""
-    address = entry.unique_id
-    assert address is not None
-    ble_device = async_ble_device_from_address(hass, address)
     keep_connect = entry.options.get(KEEP_DEVICE_CONNECTED_KEY, KEEP_DEVICE_CONNECTED)
-    coordinator: DataUpdateCoordinator[ThunderboardDevice] = hass.data[DOMAIN][entry.entry_id]    
+    coordinator: ThunderboardDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
     entities = []
     _LOGGER.debug("Got led lights: %s", coordinator.data)
 
     entities.append(
-        ThunderboardLightEntity(coordinator, coordinator.data, ble_device, keep_connect, LIGHTS_DESCRIPTIONS[ThunderboardLights.RGB_LEDS_1])
+        ThunderboardLightEntity(coordinator, coordinator.data, keep_connect, LIGHTS_DESCRIPTIONS[ThunderboardLights.RGB_LEDS_1])
     )
 
     async_add_entities(entities)
 
 class ThunderboardLightEntity(
-    CoordinatorEntity[DataUpdateCoordinator[ThunderboardDevice]], LightEntity
+    CoordinatorEntity[ThunderboardDataUpdateCoordinator], LightEntity
     ):
     """Thunderboard BLE lights for the device."""
 
@@ -83,20 +77,19 @@ class ThunderboardLightEntity(
     _attr_name = None
     _attr_supported_features = LightEntityFeature.EFFECT
     _attr_effect = None
+    _attr_effect_list = [str(effect) for effect in ThunderboardLightsEffect]
 
     def __init__(
         self, 
-        coordinator: DataUpdateCoordinator[ThunderboardDevice],
+        coordinator: ThunderboardDataUpdateCoordinator,
         thunderboard_device: ThunderboardDevice,
-        ble_device: BLEDevice,
         keep_connect: bool,
         entity_description: LightEntityDescription
     ) -> None:
         """Initialize an Thunderboard lights."""
-        super().__init__(coordinator)
+        # Updated by the coordinator only when the lights state changed
+        super().__init__(coordinator, context=entity_description.key)
         self.entity_description = entity_description
-        self.ble_device = ble_device
-        self.controller = None
         self.keep_connect = keep_connect
         self.required_rgb = (255, 255, 255)
         self.required_brightness = 255
@@ -128,37 +121,56 @@ class ThunderboardLightEntity(
         self._attr_rgb_color = self.coordinator.data.lights.rgb
         self._attr_brightness = self.coordinator.data.lights.brightness
         self._attr_is_on = self.coordinator.data.lights.power
+        self._attr_effect = self.coordinator.thunderboard.session.lights_controller().effect
         _LOGGER.debug("RGB attr: %s, is on attr: %s", self._attr_rgb_color, self._attr_is_on)
 
     async def _get_controller(self):
-        if self.controller is None:
-            self.controller = await ThunderboardLightsController.from_ble_device(_LOGGER, self.ble_device)
-        return self.controller
+        # Light commands share the coordinator connection and go before the sensor reads,
+        # between the polls that released it they lease a connection from the pool
+        return self.coordinator.thunderboard.session.lights_controller()
     
     def _update_coordinator_lights_state(self, state):
         data = self.coordinator.data
         data.lights = state
         self.coordinator.async_set_updated_data(data)
 
+    @callback
+    def _async_write_optimistic_state(self, is_on: bool, effect: str | None = None) -> None:
+        """Show the commanded state before it's written, the controller coalesces the fast commands."""
+        self._attr_is_on = is_on
+        self._attr_effect = effect
+        if is_on:
+            self._attr_rgb_color = self.required_rgb
+            self._attr_brightness = self.required_brightness
+        self.async_write_ha_state()
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the light to turn on."""
+        light_controller = await self._get_controller()
         try:
-            light_controller = await self._get_controller()
             self.required_rgb = kwargs.get(ATTR_RGB_COLOR, self.required_rgb)
             self.required_brightness = kwargs.get(ATTR_BRIGHTNESS, self.required_brightness)
-            state = await light_controller.turn_all_on(rgb=self.required_rgb, brightness=self.required_brightness)
-            self._update_coordinator_lights_state(state)
+            effect = kwargs.get(ATTR_EFFECT) if kwargs.get(ATTR_EFFECT) in self._attr_effect_list else None
+            self._async_write_optimistic_state(True, effect)
+            if effect:
+                # The frames are written by the controller until the next command
+                await light_controller.start_effect(effect, rgb=self.required_rgb, brightness=self.required_brightness)
+            else:
+                await light_controller.turn_all_on(rgb=self.required_rgb, brightness=self.required_brightness)
         except Exception as e:
             _LOGGER.error(e)
+        # Reconcile with the newest state commanded, or the last written one when the write failed
+        self._update_coordinator_lights_state(light_controller.state)
         
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the light to turn off."""
+        light_controller = await self._get_controller()
         try:
-            light_controller = await self._get_controller()
-            state = await light_controller.turn_all_off()
-            self._update_coordinator_lights_state(state)
+            self._async_write_optimistic_state(False)
+            await light_controller.turn_all_off()
         except Exception as e:
             _LOGGER.error(e)
+        self._update_coordinator_lights_state(light_controller.state)
 
     @callback
     def _handle_coordinator_update(self, *args: Any) -> None:
@@ -0,0 +1,115 @@
+""" Benchmark of the poll latency with the GATT reads pipelined or one at a time, against a fake BleakClient """
+import asyncio
+import logging
+import time
+
+from thunderboard_ble import ThunderboardBluetoothDeviceData
+from thunderboard_ble.lights import THUNDERBOARD_GATT_LIGHTS_CODECS
+from thunderboard_ble.parser import (
+    THUNDERBOARD_GATT_DEVICE_CHARS,
+    THUNDERBOARD_GATT_DIGITAL_STATE_CODECS,
+    THUNDERBOARD_GATT_SENSOR_CODECS,
+)
+from thunderboard_ble.refresh import REFRESH_EVERY_POLL, THUNDERBOARD_REFRESH_POLICIES
+
+POLLS = 10
+READ_DELAYS = (0.0075, 0.03)
+# Requests the link serves at the same time, the others wait in the stack
+LINK_CONCURRENCY = 4
+# Read every characteristic on every poll, so each poll makes the same reads
+REFRESH_POLICIES = {key: REFRESH_EVERY_POLL for key in THUNDERBOARD_REFRESH_POLICIES}
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FakeCharacteristic:
+    def __init__(self, uuid: str, handle: int, payload: bytes):
+        self.uuid = uuid
+        self.handle = handle
+        self.properties = ["read"]
+        self.payload = payload
+
+
+class FakeServices:
+    def __init__(self):
+        self.chars = {}
+        handle = 100
+        for codec in (*THUNDERBOARD_GATT_SENSOR_CODECS, *THUNDERBOARD_GATT_LIGHTS_CODECS):
+            # Zero decodes for every value, except the power source which is 1 for USB
+            payload = bytes([1]) if codec.key == "power_source" else bytes(codec.fmt.size)
+            self.chars[handle] = FakeCharacteristic(codec.uuid, handle, payload)
+            handle += 1
+        for codec in THUNDERBOARD_GATT_DIGITAL_STATE_CODECS:
+            self.chars[codec.handle] = FakeCharacteristic(f"digital-{codec.handle}", codec.handle, bytes(codec.fmt.size))
+        for c in THUNDERBOARD_GATT_DEVICE_CHARS:
+            self.chars[handle] = FakeCharacteristic(str(c["uuid"]), handle, b"1.0")
+            handle += 1
+
+    def get_characteristic(self, specifier):
+        if isinstance(specifier, int):
+            return self.chars.get(specifier)
+        return next((char for char in self.chars.values() if char.uuid == str(specifier)), None)
+
+
+class BleakClientBlueZDBus:
+    """Fake client named as the BlueZ backend, each read takes the delay once the link serves it"""
+
+    address = "00:0B:57:00:00:01"
+    is_connected = True
+
+    def __init__(self, read_delay: float):
+        self.services = FakeServices()
+        self.read_delay = read_delay
+        self.reads = 0
+        self._link = asyncio.Semaphore(LINK_CONCURRENCY)
+
+    async def read_gatt_char(self, specifier, **kwargs) -> bytearray:
+        char = specifier if isinstance(specifier, FakeCharacteristic) else self.services.get_characteristic(specifier)
+        async with self._link:
+            await asyncio.sleep(self.read_delay)
+        self.reads += 1
+        return bytearray(char.payload)
+
+    async def disconnect(self) -> None:
+        pass
+
+
+class FakeBLEDevice:
+    address = BleakClientBlueZDBus.address
+    details = {}
+
+
+async def poll_latency(read_delay: float, max_in_flight: int | None) -> tuple[float, float]:
+    """ Return the average seconds per poll and reads per poll """
+    client = BleakClientBlueZDBus(read_delay)
+    thunderboard = ThunderboardBluetoothDeviceData(_LOGGER, max_in_flight=max_in_flight, refresh_policies=REFRESH_POLICIES)
+
+    async def _connect(*args, **kwargs):
+        return client
+
+    thunderboard._connect = _connect
+    total = 0.0
+    for _ in range(POLLS):
+        # The device information is read again on each poll too
+        thunderboard.invalidate_device_info()
+        started = time.perf_counter()
+        device = await thunderboard.update_device(FakeBLEDevice())
+        total += time.perf_counter() - started
+        assert device.error is None, device.error
+    return total / POLLS, client.reads / POLLS
+
+
+async def main() -> None:
+    print(f"Fake BlueZ client, link serving {LINK_CONCURRENCY} requests at a time, {POLLS} polls averaged")
+    for read_delay in READ_DELAYS:
+        # One request in flight is the same as awaiting the reads one by one
+        before, reads = await poll_latency(read_delay, 1)
+        after, _ = await poll_latency(read_delay, None)
+        print(
+            f"per-read delay {read_delay * 1000:4.1f} ms, {reads:.0f} reads per poll: "
+            f"one at a time {before * 1000:6.1f} ms, pipelined {after * 1000:6.1f} ms ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
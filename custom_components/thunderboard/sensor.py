@@ -19,14 +19,17 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import (
+    DEGREE,
     PERCENTAGE,
     UV_INDEX,
     LIGHT_LUX,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
     EntityCategory,
+    UnitOfFrequency,
     UnitOfPressure,
     UnitOfSoundPressure,
     UnitOfTemperature,
+    UnitOfTime,
 )
 
 from homeassistant.core import HomeAssistant
@@ -42,7 +45,10 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
 )
 
-from .const import DOMAIN, MAGNETIC_STRENGTH_UNIT
+from .coordinator import ThunderboardDataUpdateCoordinator
+from .const import DOMAIN, MAGNETIC_STRENGTH_UNIT, ACCELERATION_UNIT
+
+POLLING_INTERVAL_KEY = "polling_interval"
 
 SENSOR_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
     ThunderboardSensor.SIGNAL_STRENGTH: SensorEntityDescription(
@@ -128,6 +134,110 @@ SENSOR_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
     ),
 }
 
+# Aggregates of the IMU stream, published only when it's enabled
+IMU_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
+    ThunderboardSensor.ACCELERATION_X_G: SensorEntityDescription(
+        key=ThunderboardSensor.ACCELERATION_X_G,
+        translation_key=str(ThunderboardSensor.ACCELERATION_X_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ACCELERATION_Y_G: SensorEntityDescription(
+        key=ThunderboardSensor.ACCELERATION_Y_G,
+        translation_key=str(ThunderboardSensor.ACCELERATION_Y_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ACCELERATION_Z_G: SensorEntityDescription(
+        key=ThunderboardSensor.ACCELERATION_Z_G,
+        translation_key=str(ThunderboardSensor.ACCELERATION_Z_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ACCELERATION_PEAK_G: SensorEntityDescription(
+        key=ThunderboardSensor.ACCELERATION_PEAK_G,
+        translation_key=str(ThunderboardSensor.ACCELERATION_PEAK_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ORIENTATION_ALPHA: SensorEntityDescription(
+        key=ThunderboardSensor.ORIENTATION_ALPHA,
+        translation_key=str(ThunderboardSensor.ORIENTATION_ALPHA),
+        device_class=None,
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ORIENTATION_BETA: SensorEntityDescription(
+        key=ThunderboardSensor.ORIENTATION_BETA,
+        translation_key=str(ThunderboardSensor.ORIENTATION_BETA),
+        device_class=None,
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.ORIENTATION_GAMMA: SensorEntityDescription(
+        key=ThunderboardSensor.ORIENTATION_GAMMA,
+        translation_key=str(ThunderboardSensor.ORIENTATION_GAMMA),
+        device_class=None,
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+}
+
+# Vibration and tilt features of the IMU windows, published only when NumPy is installed
+FEATURES_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
+    ThunderboardSensor.VIBRATION_RMS_G: SensorEntityDescription(
+        key=ThunderboardSensor.VIBRATION_RMS_G,
+        translation_key=str(ThunderboardSensor.VIBRATION_RMS_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.VIBRATION_PEAK_G: SensorEntityDescription(
+        key=ThunderboardSensor.VIBRATION_PEAK_G,
+        translation_key=str(ThunderboardSensor.VIBRATION_PEAK_G),
+        device_class=None,
+        native_unit_of_measurement=ACCELERATION_UNIT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.VIBRATION_CREST_FACTOR: SensorEntityDescription(
+        key=ThunderboardSensor.VIBRATION_CREST_FACTOR,
+        translation_key=str(ThunderboardSensor.VIBRATION_CREST_FACTOR),
+        device_class=None,
+        native_unit_of_measurement=None,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.VIBRATION_FREQUENCY_HZ: SensorEntityDescription(
+        key=ThunderboardSensor.VIBRATION_FREQUENCY_HZ,
+        translation_key=str(ThunderboardSensor.VIBRATION_FREQUENCY_HZ),
+        device_class=SensorDeviceClass.FREQUENCY,
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    ThunderboardSensor.TILT: SensorEntityDescription(
+        key=ThunderboardSensor.TILT,
+        translation_key=str(ThunderboardSensor.TILT),
+        device_class=None,
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+}
+
 DIGITALS_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
     ThunderboardBinarySensor.BTN_0: SensorEntityDescription(
         key=ThunderboardBinarySensor.BTN_0,
@@ -163,6 +273,15 @@ DIGITALS_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
     ),
 }
 
+POLLING_INTERVAL_DESCRIPTION = SensorEntityDescription(
+    key=POLLING_INTERVAL_KEY,
+    translation_key=POLLING_INTERVAL_KEY,
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=UnitOfTime.SECONDS,
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -174,10 +293,24 @@ async def async_setup_entry(
     entities = []
     _LOGGER.debug("Got sensors: %s", coordinator.data)
     for sensor_type in coordinator.data.sensors.keys():
+        if sensor_type in IMU_DESCRIPTIONS or sensor_type in FEATURES_DESCRIPTIONS:
+            continue
         entities.append(
             ThunderboardSensorEntity(coordinator, coordinator.data, SENSOR_DESCRIPTIONS[sensor_type])
         )
 
+    # The IMU aggregates are published after the first samples, not on the first poll
+    if coordinator.imu is not None:
+        for description in IMU_DESCRIPTIONS.values():
+            entities.append(
+                ThunderboardSensorEntity(coordinator, coordinator.data, description)
+            )
+    if coordinator.features is not None:
+        for description in FEATURES_DESCRIPTIONS.values():
+            entities.append(
+                ThunderboardSensorEntity(coordinator, coordinator.data, description)
+            )
+
     for sensor_type in coordinator.data.digitals.keys():
         entities.append(
             ThunderboardSensorEntity(coordinator, coordinator.data, DIGITALS_DESCRIPTIONS[sensor_type])
@@ -188,6 +321,11 @@ async def async_setup_entry(
         ThunderboardSensorEntity(coordinator, coordinator.data, SENSOR_DESCRIPTIONS[ThunderboardSensor.SIGNAL_STRENGTH])
     )
 
+    # Append the effective polling interval, changed by the adaptive interval
+    entities.append(
+        ThunderboardPollingIntervalEntity(coordinator, coordinator.data, POLLING_INTERVAL_DESCRIPTION)
+    )
+
     async_add_entities(entities)
 
 class ThunderboardSensorEntity(
@@ -204,7 +342,8 @@ class ThunderboardSensorEntity(
         entity_description: SensorEntityDescription,
     ) -> None:
         """Populate the Thunderboard entity with relevant data."""
-        super().__init__(coordinator)
+        # Updated by the coordinator only when the value of its key changed
+        super().__init__(coordinator, context=entity_description.key)
         self.entity_description = entity_description
 
         name = thunderboard_device.name
@@ -233,7 +372,7 @@ class ThunderboardSensorEntity(
 
     @property
     def available(self) -> bool:
-        """Check if device and sensor is available in data."""
+        """Check if device and sensor is available in data, and its value not too old."""
         return (
             super().available
             and (
@@ -241,6 +380,7 @@ class ThunderboardSensorEntity(
                 self.entity_description.key is ThunderboardSensor.SIGNAL_STRENGTH or
                 self.entity_description.key in self.coordinator.data.digitals
             )
+            and self.entity_description.key not in self.coordinator.stale_keys
         )
 
     @property
@@ -250,4 +390,28 @@ class ThunderboardSensorEntity(
             return self.coordinator.data.rssi
         if self.entity_description.key in self.coordinator.data.digitals:
             return self.coordinator.data.digitals[self.entity_description.key]
-        return self.coordinator.data.sensors[self.entity_description.key]
\ No newline at end of file
+        return self.coordinator.data.sensors[self.entity_description.key]
+
+class ThunderboardPollingIntervalEntity(ThunderboardSensorEntity):
+    """Seconds between the polls of the device."""
+
+    def __init__(
+        self,
+        coordinator: ThunderboardDataUpdateCoordinator,
+        thunderboard_device: ThunderboardDevice,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Populate the polling interval entity, updated on every coordinator update."""
+        super().__init__(coordinator, thunderboard_device, entity_description)
+        # The interval is not a key of the device, listen to all the updates
+        self.coordinator_context = None
+
+    @property
+    def available(self) -> bool:
+        """Check if the coordinator has a polling interval."""
+        return self.coordinator.last_update_success and self.coordinator.polling_interval is not None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current polling interval."""
+        return round(self.coordinator.polling_interval)
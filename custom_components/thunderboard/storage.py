@@ -0,0 +1,44 @@
+"""Persistent storage of the Thunderboard device data that rarely changes."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DEVICE_STORAGE_VERSION
+
+SAVE_DELAY = 10
+
+
+class ThunderboardDeviceStore:
+    """Data of all the Thunderboard devices, by address."""
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(hass, DEVICE_STORAGE_VERSION, key)
+        self._data: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_load(self) -> None:
+        """Load the stored data, once."""
+        async with self._lock:
+            if self._data is None:
+                self._data = await self._store.async_load() or {}
+
+    def get(self, address: str) -> Any | None:
+        """Get the data of an address."""
+        return self._data.get(address)
+
+    def async_set(self, address: str, data: Any | None) -> None:
+        """Save the data of an address when it changed."""
+        if not data or self._data.get(address) == data:
+            return
+        self._data[address] = data
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    def async_remove(self, address: str) -> None:
+        """Forget the data of an address."""
+        if self._data.pop(address, None) is not None:
+            self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
@@ -25,11 +25,58 @@ from .parser import (
 from .models import (
     ThunderboardDevice,
     ThunderboardLightsState,
+    ThunderboardReading,
 )
 
 from .lights import (
+    ALL_LEDS_MODE,
     ThunderboardLights,
-    ThunderboardLightsController
+    ThunderboardLightsController,
+    ThunderboardLightsEffect,
+    ThunderboardLightsGroup,
+)
+
+from .pipeline import ThunderboardGattPipeline, ThunderboardOperationPriority
+
+from .session import ThunderboardDeviceSession
+
+from .pool import ThunderboardConnectionPool
+
+from .scheduler import ThunderboardPollScheduler
+
+from .refresh import ThunderboardRefreshSchedule
+
+from .adaptive import ThunderboardAdaptiveInterval
+
+from .energy import ThunderboardEnergyBudget, ThunderboardEnergyPlan
+
+from .presence import ThunderboardPresenceTracker
+
+from .rssi import ThunderboardSignalTracker
+
+from .breaker import ThunderboardBreakerState, ThunderboardCircuitBreaker
+
+from .supervisor import ThunderboardReconnectSupervisor
+
+from .imu import ThunderboardImuRing, ThunderboardImuStream
+
+from .features import ThunderboardImuBatch, ThunderboardVibrationFeatures
+
+from .filters import (
+    ThunderboardFilterPolicy,
+    ThunderboardPublishFilter,
+)
+
+from .dispatch import ThunderboardKeyDispatcher
+
+from .stream import (
+    ThunderboardReadingBuffer,
+    ThunderboardStreamOverflow,
+)
+
+from .codec import (
+    ThunderboardCharacteristicCodec,
+    ThunderboardCodecRegistry,
 )
 
 __version__ = "0.1.0"
@@ -42,7 +89,36 @@ __all__ = [
     "ThunderboardDeviceInfo",
     "ThunderboardLights",
     "ThunderboardLightsController",
+    "ThunderboardLightsEffect",
+    "ThunderboardLightsGroup",
+    "ALL_LEDS_MODE",
     "ThunderboardLightsState",
+    "ThunderboardReading",
+    "ThunderboardFilterPolicy",
+    "ThunderboardPublishFilter",
+    "ThunderboardKeyDispatcher",
+    "ThunderboardReadingBuffer",
+    "ThunderboardStreamOverflow",
+    "ThunderboardGattPipeline",
+    "ThunderboardOperationPriority",
+    "ThunderboardDeviceSession",
+    "ThunderboardConnectionPool",
+    "ThunderboardPollScheduler",
+    "ThunderboardRefreshSchedule",
+    "ThunderboardAdaptiveInterval",
+    "ThunderboardEnergyBudget",
+    "ThunderboardEnergyPlan",
+    "ThunderboardPresenceTracker",
+    "ThunderboardSignalTracker",
+    "ThunderboardBreakerState",
+    "ThunderboardCircuitBreaker",
+    "ThunderboardReconnectSupervisor",
+    "ThunderboardImuRing",
+    "ThunderboardImuStream",
+    "ThunderboardImuBatch",
+    "ThunderboardVibrationFeatures",
+    "ThunderboardCharacteristicCodec",
+    "ThunderboardCodecRegistry",
     "BinarySensorDeviceClass",
     "BinarySensorValue",
     "SensorDescription",
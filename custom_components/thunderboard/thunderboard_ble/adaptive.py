@@ -0,0 +1,86 @@
+"""
+Polling interval of a Thunderboard Sense 2 adapted to how fast its values change.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from .models import ThunderboardDevice
+
+DEFAULT_BACKOFF = 1.5
+
+# Change of each value that is worth a poll, around the sensor noise.
+# The sound level changes all the time with the room activity and is not tracked.
+THUNDERBOARD_ADAPTIVE_STEPS: dict[str, float] = {
+    "temperature": 0.2,
+    "humidity": 1.0,
+    "pressure": 20.0,
+    "uv_idx": 1.0,
+    "ambient_light": 20.0,
+}
+
+
+class ThunderboardAdaptiveInterval:
+    """Shorten the polling interval when the values change fast, back off up to the ceiling when stable."""
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        steps: Optional[dict[str, float]] = None,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        super().__init__()
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.steps = steps if steps is not None else THUNDERBOARD_ADAPTIVE_STEPS
+        self.backoff = backoff
+        # Start fast, the first stable polls back off
+        self.interval = min_interval
+        # Seconds the fastest changing value took to change by one step on the last poll
+        self.time_per_step: Optional[float] = None
+        # Last value of each key and the wall clock time it was read, see ThunderboardDevice.timestamps
+        self._values: dict[str, tuple[Any, float]] = {}
+
+    @property
+    def stats(self) -> dict[str, Optional[float]]:
+        return {
+            "interval": self.interval,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "time_per_step": self.time_per_step,
+        }
+
+    def _get_time_per_step(self, values: dict[str, tuple[Any, float]]) -> Optional[float]:
+        fastest = None
+        for key, step in self.steps.items():
+            if key not in self._values or key not in values:
+                continue
+            (old, old_at), (new, new_at) = self._values[key], values[key]
+            # Only a value read again gives a rate, the ones carried over between their reads don't
+            if new_at <= old_at:
+                continue
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == new:
+                continue
+            seconds = (new_at - old_at) * step / abs(new - old)
+            fastest = seconds if fastest is None else min(fastest, seconds)
+        return fastest
+
+    def update(self, device: ThunderboardDevice, now: Optional[float] = None) -> float:
+        """ Get the interval until the next poll from the values read, timed by when each one was read """
+        now = time.time() if now is None else now
+        values = {
+            key: (device.sensors[key], device.timestamps.get(key, now))
+            for key in self.steps if key in device.sensors
+        }
+        if self._values:
+            self.time_per_step = self._get_time_per_step(values)
+            if self.time_per_step is not None and self.time_per_step < self.interval:
+                # Poll about once per step of the fastest changing value
+                self.interval = self.time_per_step
+            else:
+                self.interval *= self.backoff
+            self.interval = min(self.max_interval, max(self.min_interval, self.interval))
+        self._values.update(values)
+        return self.interval
@@ -0,0 +1,109 @@
+"""
+Circuit breaker of the connections to a Thunderboard Sense 2, to stop connecting to a board out of range.
+"""
+from __future__ import annotations
+
+from collections import deque
+import time
+from typing import Any, Optional
+
+from sensor_state_data.enum import StrEnum
+
+# Failed connections in a row before the breaker opens
+DEFAULT_FAILURE_THRESHOLD = 3
+# Wait before the first probe of an open breaker, doubled on each failed probe up to the maximum
+DEFAULT_PROBE_BACKOFF = 60.0
+DEFAULT_MAX_PROBE_BACKOFF = 900.0
+# An advertisement after this long without any is the board coming back in range, it's probed at once
+RETURN_SILENCE = 60.0
+# Transitions kept for the diagnostics
+TRANSITIONS_HISTORY = 10
+
+
+class ThunderboardBreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ThunderboardCircuitBreaker:
+    """Stop the connections after repeated failures, a single probe is let through to close it again.
+
+    The probe is made after a backoff, or as soon as the board advertises again after a silence.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        backoff: float = DEFAULT_PROBE_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_PROBE_BACKOFF,
+    ):
+        super().__init__()
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max(backoff, max_backoff)
+        self.state = ThunderboardBreakerState.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.probes = 0
+        self._probe_backoff = backoff
+        self._retry_at: Optional[float] = None
+        self._last_advertisement: Optional[float] = None
+        self._returned = False
+        self._transitions: deque[dict[str, Any]] = deque(maxlen=TRANSITIONS_HISTORY)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": str(self.state),
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "probes": self.probes,
+            "retry_in": max(0.0, self._retry_at - time.monotonic()) if self._retry_at is not None else None,
+            "transitions": list(self._transitions),
+        }
+
+    def _set_state(self, state: ThunderboardBreakerState, reason: str) -> None:
+        self._transitions.append({"time": time.time(), "from": str(self.state), "to": str(state), "reason": reason})
+        self.state = state
+
+    def record_advertisement(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self._last_advertisement is None or now - self._last_advertisement >= RETURN_SILENCE:
+            self._returned = True
+        self._last_advertisement = now
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """ Whether a connection can be attempted now, an open breaker lets a single probe through """
+        if self.state == ThunderboardBreakerState.CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if self._returned or now >= self._retry_at:
+            # A probe that never reported back is given up after the backoff
+            self._set_state(ThunderboardBreakerState.HALF_OPEN, "advertisement" if self._returned else "backoff")
+            self._returned = False
+            self._retry_at = now + self._probe_backoff
+            self.probes += 1
+            return True
+        # Open and waiting, or the probe is in flight
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_backoff = self.backoff
+        self._retry_at = None
+        if self.state != ThunderboardBreakerState.CLOSED:
+            self._set_state(ThunderboardBreakerState.CLOSED, "connected")
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state == ThunderboardBreakerState.HALF_OPEN:
+            # The probe failed, wait longer before the next one
+            self._probe_backoff = min(self.max_backoff, self._probe_backoff * 2)
+        elif self.state == ThunderboardBreakerState.OPEN or self.failures < self.failure_threshold:
+            return
+        self._retry_at = now + self._probe_backoff
+        self._returned = False
+        self._set_state(ThunderboardBreakerState.OPEN, f"{self.failures} failed connections")
@@ -0,0 +1,86 @@
+"""
+Precompiled codecs for Thunderboard Sense 2 GATT characteristics.
+"""
+from __future__ import annotations
+
+import dataclasses
+import struct
+from typing import Any, Callable, Iterable, Optional
+
+from bleak.backends.characteristic import BleakGATTCharacteristic
+
+
+def identity(value: Any) -> Any:
+    return value
+
+
+def divide_by(divider: Optional[int]) -> Callable[[Any], Any]:
+    """ Build the scaling function for a characteristic divider """
+    if not divider:
+        return identity
+    return lambda value: value / divider
+
+
+@dataclasses.dataclass(frozen=True)
+class ThunderboardCharacteristicCodec:
+    """Decoding rules for a characteristic, built once from the descriptor tables"""
+
+    key: str
+    fmt: struct.Struct
+    scale: Callable[[Any], Any] = identity
+    post: Callable[[Any], Any] = identity
+    uuid: Optional[str] = None
+    handle: Optional[int] = None
+    char: Optional[BleakGATTCharacteristic] = None
+
+    def decode(self, payload: bytes | bytearray) -> Any:
+        values = self.fmt.unpack(payload)
+        value = values[0] if len(values) == 1 else values
+        return self.post(self.scale(value))
+
+    def resolve(self, services, handle: Optional[int] = None) -> ThunderboardCharacteristicCodec:
+        """ Bind the codec to the characteristic found in the discovered services, at a known handle if given """
+        if handle is None:
+            handle = self.handle
+        char = services.get_characteristic(handle if handle is not None else self.uuid)
+        if char is None or (self.uuid is not None and str(char.uuid) != self.uuid):
+            raise KeyError(f"Characteristic {self.uuid or handle} not found for {self.key}")
+        return dataclasses.replace(self, uuid=str(char.uuid), handle=char.handle, char=char)
+
+
+class ThunderboardCodecRegistry:
+    """Codecs resolved against the services of a connection, keyed by handle."""
+
+    def __init__(
+        self,
+        services,
+        sensors: Iterable[ThunderboardCharacteristicCodec] = (),
+        digitals: Iterable[ThunderboardCharacteristicCodec] = (),
+        lights: Iterable[ThunderboardCharacteristicCodec] = (),
+        handle_map: Optional[dict[str, int]] = None,
+    ):
+        super().__init__()
+        self.services = services
+        # Handles known from a previous connection, a mismatch raises KeyError so the caller can rediscover
+        self.from_handle_map = bool(handle_map)
+        handle_map = handle_map or {}
+        # Keep the descriptor order, the polling path relies on it
+        self.sensors = [codec.resolve(services, handle_map.get(str(codec.key))) for codec in sensors]
+        self.digitals = [codec.resolve(services, handle_map.get(str(codec.key))) for codec in digitals]
+        self.lights = [codec.resolve(services, handle_map.get(str(codec.key))) for codec in lights]
+        self.by_handle: dict[int, ThunderboardCharacteristicCodec] = {
+            codec.handle: codec for codec in (*self.sensors, *self.digitals, *self.lights)
+        }
+        self.by_key: dict[str, ThunderboardCharacteristicCodec] = {
+            str(codec.key): codec for codec in self.by_handle.values()
+        }
+
+    @property
+    def handle_map(self) -> dict[str, int]:
+        """ The resolved handles by key, to be persisted and given back on the next connection """
+        return {key: codec.handle for key, codec in self.by_key.items()}
+
+    def get(self, sender: BleakGATTCharacteristic | int) -> ThunderboardCharacteristicCodec:
+        """ Get the codec for a characteristic or a handle, as given to notification callbacks """
+        handle = sender if isinstance(sender, int) else sender.handle
+        return self.by_handle[handle]
@@ -34,6 +34,11 @@ CHARACTERISTIC_DIGITAL_STATE_0 = "00002a56-0000-1000-8000-00805f9b34fb"
 CHARACTERISTIC_HANDLE_DIGITAL_STATE_0 = 28
 CHARACTERISTIC_HANDLE_DIGITAL_STATE_1 = 33
 
+# IMU, notified only
+CHARACTERISTIC_ACCELERATION     = "c4c1f6e2-4be5-11e5-885d-feff819cdc9f"
+CHARACTERISTIC_ORIENTATION      = "b7c4b694-bee3-45dd-ba9f-f3b5e994f49a"
+CHARACTERISTIC_IMU_CONTROL_POINT = "71e30b8c-4131-4703-b0a0-b0bbba75856b"
+
 # Details
 # Power source
 # Read
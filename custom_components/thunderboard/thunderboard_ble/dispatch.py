@@ -0,0 +1,90 @@
+"""
+Dispatch of the Thunderboard Sense 2 updates only to the listeners of the keys that changed.
+"""
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Callable, Iterable, Optional
+
+from .filters import SIGNAL_STRENGTH_KEY
+from .lights import ThunderboardLights
+from .models import ThunderboardDevice
+
+LIGHTS_KEY = str(ThunderboardLights.RGB_LEDS_1)
+
+# Listeners registered without a key get every update
+ListenerType = tuple[Callable[[], None], Optional[Any]]
+
+
+def get_device_values(device: ThunderboardDevice) -> dict[str, Any]:
+    """ Get the values of the device by listener key """
+    values: dict[str, Any] = {**device.sensors, **device.digitals, SIGNAL_STRENGTH_KEY: device.rssi}
+    # The lights state is replaced or changed in place by the light entity, keep a copy
+    values[LIGHTS_KEY] = dataclasses.astuple(device.lights) if device.lights else None
+    return values
+
+
+def get_device_identity(device: ThunderboardDevice) -> tuple:
+    """ The information shared by all the entities of the device """
+    return (device.address, device.name, device.identifier, device.model, device.hw_version, device.sw_version)
+
+
+class ThunderboardKeyDispatcher:
+    """Track the values of the last update and wake only the listeners of the changed keys."""
+
+    def __init__(self):
+        super().__init__()
+        self._values: Optional[dict[str, Any]] = None
+        self._identity: Optional[tuple] = None
+        self.updates = 0
+        self.callbacks = 0
+        self.skipped = 0
+
+    @property
+    def stats(self) -> dict[str, float]:
+        return {
+            "updates": self.updates,
+            "callbacks": self.callbacks,
+            "skipped": self.skipped,
+            "callbacks_per_update": self.callbacks / self.updates if self.updates else 0.0,
+        }
+
+    def changed_keys(self, device: Optional[ThunderboardDevice]) -> Optional[set[str]]:
+        """ Get the keys changed since the last call, None when every listener needs the update """
+        if device is None:
+            self._values = self._identity = None
+            return None
+        values = get_device_values(device)
+        identity = get_device_identity(device)
+        previous, previous_identity = self._values, self._identity
+        self._values, self._identity = values, identity
+        if previous is None or identity != previous_identity:
+            return None
+        return {
+            key for key in values.keys() | previous.keys()
+            if key not in values or key not in previous or values[key] != previous[key]
+        }
+
+    def dispatch(
+        self,
+        device: Optional[ThunderboardDevice],
+        listeners: Iterable[ListenerType],
+        broadcast: bool = False,
+        keys: Iterable[str] = (),
+    ) -> int:
+        """ Call the listeners of the changed keys, of keys and the ones without a key, return how many were called """
+        changed = self.changed_keys(device)
+        if broadcast:
+            changed = None
+        elif changed is not None:
+            changed.update(keys)
+        self.updates += 1
+        called = 0
+        for update_callback, key in list(listeners):
+            if changed is None or key is None or key in changed:
+                update_callback()
+                called += 1
+            else:
+                self.skipped += 1
+        self.callbacks += called
+        return called
@@ -0,0 +1,124 @@
+"""
+Battery budget of a Thunderboard Sense 2, choosing how often to poll and whether to keep the connection.
+"""
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import Any, Optional
+
+from .models import ThunderboardDevice
+
+# CR2032 coin cell of the board
+DEFAULT_BATTERY_CAPACITY_MAH = 220.0
+# Never poll a battery powered board less often than this
+DEFAULT_MAX_BUDGET_INTERVAL = 6 * 3600
+
+# Estimated charge used by the board, the demo firmware powers the sensors while a connection is open.
+# The estimates are corrected by the measured battery drain, see ThunderboardEnergyBudget.scale.
+CONNECT_COST_MAH = 0.02
+READ_COST_MAH = 0.0005
+KEEP_OPEN_COST_MAH_PER_HOUR = 1.0
+IDLE_COST_MAH_PER_HOUR = 0.01
+
+# Battery percentage drop needed before the estimates are corrected, and the bounds of the correction
+CALIBRATION_MIN_DROP = 5
+CALIBRATION_SCALE_BOUNDS = (0.25, 4.0)
+
+POWER_SOURCE_KEY = "power_source"
+BATTERY_KEY = "battery"
+POWER_SOURCE_BATTERY = "Battery"
+
+
+@dataclasses.dataclass
+class ThunderboardEnergyPlan:
+    """How the next polls of the board should be done"""
+
+    interval: float
+    keep_connect: bool
+    on_battery: bool
+
+
+class ThunderboardEnergyBudget:
+    """Spread the battery charge over the target lifetime, USB powered boards are polled as fast as allowed."""
+
+    def __init__(
+        self,
+        lifetime_days: float,
+        min_interval: float,
+        max_interval: float = DEFAULT_MAX_BUDGET_INTERVAL,
+        capacity: float = DEFAULT_BATTERY_CAPACITY_MAH,
+    ):
+        super().__init__()
+        self.lifetime_days = lifetime_days
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.capacity = capacity
+        # Measured drain over the estimated one
+        self.scale = 1.0
+        self.spent = 0.0
+        self.plan = ThunderboardEnergyPlan(min_interval, True, False)
+        self._updated_at: Optional[float] = None
+        self._calibration: Optional[tuple[float, float]] = None
+
+    @property
+    def budget_per_hour(self) -> float:
+        """ Average charge the board can use per hour to reach the target lifetime """
+        return self.capacity / (self.lifetime_days * 24)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            **dataclasses.asdict(self.plan),
+            "budget_per_hour": self.budget_per_hour,
+            "scale": self.scale,
+            "spent": self.spent,
+        }
+
+    def _charge(self, device: ThunderboardDevice, reads: int, connects: int, now: float) -> None:
+        hours = (now - self._updated_at) / 3600 if self._updated_at is not None else 0.0
+        link = KEEP_OPEN_COST_MAH_PER_HOUR if self.plan.keep_connect and self.plan.on_battery else 0.0
+        self.spent += connects * CONNECT_COST_MAH + reads * READ_COST_MAH + hours * (IDLE_COST_MAH_PER_HOUR + link)
+        battery = device.sensors.get(BATTERY_KEY)
+        if not isinstance(battery, (int, float)):
+            return
+        if self._calibration is None or battery > self._calibration[0]:
+            # First reading or a new battery
+            self._calibration = (battery, self.spent)
+            return
+        drop = self._calibration[0] - battery
+        estimated = self.spent - self._calibration[1]
+        if drop >= CALIBRATION_MIN_DROP and estimated > 0:
+            low, high = CALIBRATION_SCALE_BOUNDS
+            self.scale = min(high, max(low, drop / 100 * self.capacity / estimated))
+
+    def update(
+        self,
+        device: ThunderboardDevice,
+        reads: int,
+        connects: int,
+        keep_connect: bool = True,
+        now: Optional[float] = None,
+    ) -> ThunderboardEnergyPlan:
+        """ Account the last poll and plan the next ones, keep_connect is what the user asked for """
+        now = time.monotonic() if now is None else now
+        self._charge(device, reads, connects, now)
+        self._updated_at = now
+        if device.sensors.get(POWER_SOURCE_KEY) != POWER_SOURCE_BATTERY:
+            self.plan = ThunderboardEnergyPlan(self.min_interval, keep_connect, False)
+            return self.plan
+
+        budget = self.budget_per_hour - IDLE_COST_MAH_PER_HOUR * self.scale
+        read_cost = max(reads, 1) * READ_COST_MAH * self.scale
+        # A kept connection costs the link but no reconnection on each poll
+        link_budget = budget - KEEP_OPEN_COST_MAH_PER_HOUR * self.scale
+        keep_open = keep_connect and link_budget > 0
+        if keep_open:
+            interval = 3600 * read_cost / link_budget
+        elif budget > 0:
+            interval = 3600 * (CONNECT_COST_MAH * self.scale + read_cost) / budget
+        else:
+            interval = self.max_interval
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        self.plan = ThunderboardEnergyPlan(interval, keep_open, True)
+        return self.plan
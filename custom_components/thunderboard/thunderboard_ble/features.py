@@ -0,0 +1,139 @@
+"""
+Vibration and tilt features of the Thunderboard Sense 2 IMU, computed with NumPy over sliding windows of the buffered samples.
+"""
+from __future__ import annotations
+
+from array import array
+import asyncio
+from dataclasses import dataclass
+import time
+from typing import Any, Optional
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
+from .imu import ACCELERATION_SCALE, IMU_AXES, ORIENTATION_SCALE, ThunderboardImuStream
+
+# Samples of each window, a power of two for the FFT, and samples between the starts of two windows
+DEFAULT_FEATURE_WINDOW = 256
+DEFAULT_FEATURE_HOP = 128
+
+# Keys of the published features, see parser.ThunderboardSensor
+VIBRATION_RMS_KEY = "vibration_rms"
+VIBRATION_PEAK_KEY = "vibration_peak"
+VIBRATION_CREST_FACTOR_KEY = "vibration_crest_factor"
+VIBRATION_FREQUENCY_KEY = "vibration_frequency"
+TILT_KEY = "tilt"
+
+
+@dataclass
+class ThunderboardImuBatch:
+    """Raw samples copied out of the rings, to be processed outside of the event loop."""
+
+    acceleration: bytes
+    times: array
+    orientation: Optional[bytes] = None
+
+
+class ThunderboardVibrationFeatures:
+    """Batch the samples of the IMU rings into overlapping windows and compute their features at once.
+
+    The batch is copied on the event loop, it's cheap, the features are computed in an executor.
+    """
+
+    def __init__(self, window: int = DEFAULT_FEATURE_WINDOW, hop: int = DEFAULT_FEATURE_HOP):
+        super().__init__()
+        self.window = window
+        self.hop = hop
+        # Acceleration samples already in a window
+        self._done = 0
+        self._orientation_done = 0
+        self.batches = 0
+        self.windows = 0
+        self.skipped = 0
+        self.compute_time = 0.0
+        self._busy = False
+
+    @staticmethod
+    def is_available() -> bool:
+        return np is not None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "windows": self.windows,
+            "skipped": self.skipped,
+            "compute_time": self.compute_time,
+            "windows_per_second": self.windows / self.compute_time if self.compute_time else None,
+        }
+
+    def take_batch(self, imu: ThunderboardImuStream) -> Optional[ThunderboardImuBatch]:
+        """ Copy the samples not in a window yet, with the overlap of the last window, None until a window is full """
+        ring = imu.acceleration
+        # The next window starts a hop after the start of the last one
+        start = max(self._done - (self.window - self.hop), ring.count - ring.size, 0)
+        if ring.count - start < self.window:
+            return None
+        raw, times = ring.copy(start, ring.count)
+        # Only whole hops are consumed, the remaining samples start the next batch
+        windows = (ring.count - start - self.window) // self.hop + 1
+        self._done = start + (windows - 1) * self.hop + self.window
+        orientation = None
+        if imu.orientation.count > self._orientation_done:
+            self._orientation_done = imu.orientation.count
+            orientation, _ = imu.orientation.copy(imu.orientation.count - 1, imu.orientation.count)
+        return ThunderboardImuBatch(raw, times, orientation)
+
+    def compute(self, batch: ThunderboardImuBatch) -> dict[str, float]:
+        """ Features of the window with the most vibration and the latest tilt, in g, Hz and degrees """
+        started = time.perf_counter()
+        samples = np.frombuffer(batch.acceleration, dtype="<i2").reshape(-1, IMU_AXES) * ACCELERATION_SCALE
+        times = np.frombuffer(batch.times, dtype=np.float64)
+        # (windows, axes, window), views on the samples without copying them
+        windows = sliding_window_view(samples, self.window, axis=0)[::self.hop]
+        # Vibration is the acceleration around its mean, without the gravity
+        dynamic = windows - windows.mean(axis=2, keepdims=True)
+        magnitude = np.sqrt((dynamic ** 2).sum(axis=1))
+        rms = np.sqrt((magnitude ** 2).mean(axis=1))
+        peak = magnitude.max(axis=1)
+        # Amplitude spectrum of all the axes, without the DC bin
+        spectrum = np.abs(np.fft.rfft(dynamic, axis=2)).sum(axis=1)
+        spectrum[:, 0] = 0
+        worst = int(rms.argmax())
+        features = {
+            VIBRATION_RMS_KEY: round(float(rms[worst]), 4),
+            VIBRATION_PEAK_KEY: round(float(peak.max()), 4),
+            VIBRATION_CREST_FACTOR_KEY: round(float(peak[worst] / rms[worst]), 2) if rms[worst] > 0 else None,
+        }
+        elapsed = times[-1] - times[0]
+        if elapsed > 0:
+            # The notifications come in bursts of connection events, the mean rate of the batch is the sample rate
+            rate = (len(times) - 1) / elapsed
+            features[VIBRATION_FREQUENCY_KEY] = round(float(spectrum[worst].argmax() * rate / self.window), 2)
+        if batch.orientation is not None:
+            _, beta, gamma = np.radians(np.frombuffer(batch.orientation, dtype="<i2") * ORIENTATION_SCALE)
+            # Angle between the board normal and the vertical
+            features[TILT_KEY] = round(float(np.degrees(np.arccos(np.cos(beta) * np.cos(gamma)))), 2)
+        self.batches += 1
+        self.windows += len(windows)
+        self.compute_time += time.perf_counter() - started
+        return {key: value for key, value in features.items() if value is not None}
+
+    async def process(self, imu: ThunderboardImuStream) -> dict[str, float]:
+        """ Compute the features of the new samples in the default executor, empty without a full window """
+        if self._busy:
+            # The previous batch is still computed, its samples are in the next one
+            self.skipped += 1
+            return {}
+        batch = self.take_batch(imu)
+        if batch is None:
+            return {}
+        self._busy = True
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.compute, batch)
+        finally:
+            self._busy = False
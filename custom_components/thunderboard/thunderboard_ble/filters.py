@@ -0,0 +1,138 @@
+"""
+Deadband and rate limit filtering of the Thunderboard Sense 2 values before they are published.
+"""
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import Any, Optional
+
+from .models import ThunderboardDevice
+
+DEFAULT_HEARTBEAT = 600.0
+# Key used for the RSSI of the device, same as ThunderboardSensor.SIGNAL_STRENGTH
+SIGNAL_STRENGTH_KEY = "signal_strength"
+
+
+@dataclasses.dataclass(frozen=True)
+class ThunderboardFilterPolicy:
+    """When a new value of a key is worth publishing"""
+
+    # Smallest change published, in the unit of the value
+    absolute: float = 0.0
+    # Smallest change published, relative to the last published value
+    relative: float = 0.0
+    # Minimum seconds between two published values
+    min_interval: float = 0.0
+    # The value is published again after this many seconds, even inside the deadband or unchanged
+    heartbeat: float = DEFAULT_HEARTBEAT
+
+    def is_changed(self, old: Any, new: Any) -> bool:
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or isinstance(new, bool):
+            return old != new
+        delta = abs(new - old)
+        threshold = max(self.absolute, self.relative * abs(old))
+        return delta >= threshold if threshold else delta > 0
+
+
+# Sensor noise on the board is around these values, keys not listed publish any change
+THUNDERBOARD_FILTER_POLICIES: dict[str, ThunderboardFilterPolicy] = {
+    SIGNAL_STRENGTH_KEY: ThunderboardFilterPolicy(absolute=3, min_interval=60),
+    "battery": ThunderboardFilterPolicy(absolute=1, min_interval=300),
+    "temperature": ThunderboardFilterPolicy(absolute=0.1),
+    "humidity": ThunderboardFilterPolicy(absolute=0.5),
+    "pressure": ThunderboardFilterPolicy(absolute=10),
+    "sound_level": ThunderboardFilterPolicy(absolute=1, min_interval=30),
+    "ambient_light": ThunderboardFilterPolicy(absolute=1, relative=0.05),
+    "hall_field_strenght": ThunderboardFilterPolicy(absolute=1),
+    "acceleration_x": ThunderboardFilterPolicy(absolute=0.02),
+    "acceleration_y": ThunderboardFilterPolicy(absolute=0.02),
+    "acceleration_z": ThunderboardFilterPolicy(absolute=0.02),
+    "acceleration_peak": ThunderboardFilterPolicy(absolute=0.02),
+    "orientation_alpha": ThunderboardFilterPolicy(absolute=1),
+    "orientation_beta": ThunderboardFilterPolicy(absolute=1),
+    "orientation_gamma": ThunderboardFilterPolicy(absolute=1),
+    "vibration_rms": ThunderboardFilterPolicy(absolute=0.005, relative=0.05),
+    "vibration_peak": ThunderboardFilterPolicy(absolute=0.01, relative=0.05),
+    "vibration_crest_factor": ThunderboardFilterPolicy(absolute=0.1),
+    "vibration_frequency": ThunderboardFilterPolicy(absolute=0.5),
+    "tilt": ThunderboardFilterPolicy(absolute=1),
+}
+
+
+class ThunderboardPublishFilter:
+    """Keep a published copy of the device, updated only with the values that passed the policies."""
+
+    def __init__(
+        self,
+        policies: Optional[dict[str, ThunderboardFilterPolicy]] = None,
+        default_policy: ThunderboardFilterPolicy = ThunderboardFilterPolicy(),
+    ):
+        super().__init__()
+        self.policies = {**THUNDERBOARD_FILTER_POLICIES, **(policies or {})}
+        self.default_policy = default_policy
+        self._published: Optional[ThunderboardDevice] = None
+        self._published_at: dict[str, float] = {}
+        self._received: dict[str, int] = {}
+        self._passed: dict[str, int] = {}
+        # Keys published again by their heartbeat, the dispatch can't tell them from an unchanged value
+        self._republished: set[str] = set()
+
+    @property
+    def published(self) -> Optional[ThunderboardDevice]:
+        return self._published
+
+    @property
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            key: {
+                "received": received,
+                "published": self._passed.get(key, 0),
+                "suppressed_ratio": 1 - self._passed.get(key, 0) / received,
+            }
+            for key, received in self._received.items()
+        }
+
+    def _accept(self, key: str, value: Any, published: dict[str, Any], now: float) -> bool:
+        self._received[key] = self._received.get(key, 0) + 1
+        if key in published and key in self._published_at:
+            policy = self.policies.get(key, self.default_policy)
+            old = published[key]
+            elapsed = now - self._published_at[key]
+            if policy.heartbeat and elapsed >= policy.heartbeat:
+                if old == value:
+                    self._republished.add(key)
+            elif old == value or elapsed < policy.min_interval or not policy.is_changed(old, value):
+                return False
+        self._published_at[key] = now
+        self._passed[key] = self._passed.get(key, 0) + 1
+        return True
+
+    def pop_republished(self) -> set[str]:
+        """ Get and clear the keys published again with the same value since the last call """
+        keys, self._republished = self._republished, set()
+        return keys
+
+    def apply(self, device: ThunderboardDevice, now: Optional[float] = None) -> ThunderboardDevice:
+        """ Get the device to publish, the previous object is returned when nothing passed """
+        now = time.monotonic() if now is None else now
+        previous = self._published
+        sensors = dict(previous.sensors) if previous else {}
+        digitals = dict(previous.digitals) if previous else {}
+        changed = previous is None
+        for values, published in ((device.sensors, sensors), (device.digitals, digitals)):
+            for key, value in values.items():
+                if self._accept(key, value, published, now):
+                    published[key] = value
+                    changed = True
+
+        rssi = previous.rssi if previous else None
+        if device.rssi is not None and self._accept(SIGNAL_STRENGTH_KEY, device.rssi, {SIGNAL_STRENGTH_KEY: rssi} if previous else {}, now):
+            rssi = device.rssi
+            changed = True
+
+        # Identity and lights are not filtered
+        candidate = dataclasses.replace(device, sensors=sensors, digitals=digitals, rssi=rssi)
+        if changed or candidate != previous:
+            self._published = candidate
+        return self._published
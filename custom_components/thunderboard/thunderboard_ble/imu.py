@@ -0,0 +1,145 @@
+"""
+Acceleration and orientation notifications of the Thunderboard Sense 2 IMU, buffered raw and published as aggregates.
+"""
+from __future__ import annotations
+
+from array import array
+import math
+import sys
+import time
+from typing import Any, Optional
+
+# Each sample is three little endian int16, x y z or alpha beta gamma
+IMU_SAMPLE_SIZE = 6
+IMU_AXES = 3
+# Units of the raw values, 1/1000 g and 1/100 degree
+ACCELERATION_SCALE = 0.001
+ORIENTATION_SCALE = 0.01
+# Samples kept between two aggregates, the older ones are overwritten
+DEFAULT_IMU_BUFFER_SAMPLES = 1024
+
+# Keys of the published aggregates, see parser.ThunderboardSensor
+ACCELERATION_KEYS = ("acceleration_x", "acceleration_y", "acceleration_z")
+ACCELERATION_PEAK_KEY = "acceleration_peak"
+ORIENTATION_KEYS = ("orientation_alpha", "orientation_beta", "orientation_gamma")
+
+
+class ThunderboardImuRing:
+    """Fixed size ring of the raw samples, written in place without decoding them."""
+
+    def __init__(self, size: int = DEFAULT_IMU_BUFFER_SAMPLES):
+        super().__init__()
+        self.size = size
+        self._raw = bytearray(IMU_SAMPLE_SIZE * size)
+        self._times = array("d", bytes(8 * size))
+        # Samples written since the start, the next one goes at count % size
+        self.count = 0
+        self.malformed = 0
+
+    def push(self, payload: bytes, now: float) -> None:
+        if len(payload) != IMU_SAMPLE_SIZE:
+            self.malformed += 1
+            return
+        index = self.count % self.size
+        offset = index * IMU_SAMPLE_SIZE
+        self._raw[offset:offset + IMU_SAMPLE_SIZE] = payload
+        self._times[index] = now
+        self.count += 1
+
+    def values(self) -> memoryview | array:
+        """ The raw values of all the slots, as int16 """
+        if sys.byteorder == "little":
+            return memoryview(self._raw).cast("h")
+        values = array("h", self._raw)
+        values.byteswap()
+        return values
+
+    def time_of(self, count: int) -> float:
+        return self._times[count % self.size]
+
+    def copy(self, start: int, stop: int) -> tuple[bytes, array]:
+        """ Copy of the raw samples and times from the start count to the stop count, in order """
+        start = max(start, stop - self.size, 0)
+        first, last = start % self.size, (stop - 1) % self.size + 1
+        if stop <= start:
+            return b"", array("d")
+        if first < last:
+            return bytes(self._raw[first * IMU_SAMPLE_SIZE:last * IMU_SAMPLE_SIZE]), self._times[first:last]
+        # The samples wrap around the end of the ring
+        raw = self._raw[first * IMU_SAMPLE_SIZE:] + self._raw[:last * IMU_SAMPLE_SIZE]
+        return bytes(raw), self._times[first:] + self._times[:last]
+
+
+class ThunderboardImuStream:
+    """Buffer the IMU notifications and aggregate the samples received since the last aggregate."""
+
+    def __init__(self, size: int = DEFAULT_IMU_BUFFER_SAMPLES):
+        super().__init__()
+        self.acceleration = ThunderboardImuRing(size)
+        self.orientation = ThunderboardImuRing(size)
+        # Samples of each ring already aggregated
+        self._acceleration_done = 0
+        self._orientation_done = 0
+        self.overruns = 0
+        self.rate: Optional[float] = None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "acceleration_samples": self.acceleration.count,
+            "orientation_samples": self.orientation.count,
+            "rate": self.rate,
+            "overruns": self.overruns,
+            "malformed": self.acceleration.malformed + self.orientation.malformed,
+        }
+
+    def handle_acceleration(self, sender, payload: bytearray) -> None:
+        self.acceleration.push(payload, time.monotonic())
+
+    def handle_orientation(self, sender, payload: bytearray) -> None:
+        self.orientation.push(payload, time.monotonic())
+
+    def _window(self, ring: ThunderboardImuRing, done: int) -> range:
+        if ring.count - done > ring.size:
+            # The oldest samples were overwritten before being aggregated
+            self.overruns += ring.count - done - ring.size
+            done = ring.count - ring.size
+        return range(done, ring.count)
+
+    def _aggregate_acceleration(self) -> dict[str, float]:
+        ring = self.acceleration
+        window = self._window(ring, self._acceleration_done)
+        self._acceleration_done = ring.count
+        if not window:
+            return {}
+        values = ring.values()
+        sums = [0, 0, 0]
+        peak = 0
+        for count in window:
+            offset = count % ring.size * IMU_AXES
+            x, y, z = values[offset], values[offset + 1], values[offset + 2]
+            sums[0] += x
+            sums[1] += y
+            sums[2] += z
+            peak = max(peak, x * x + y * y + z * z)
+        elapsed = ring.time_of(window[-1]) - ring.time_of(window[0])
+        if len(window) > 1 and elapsed > 0:
+            self.rate = (len(window) - 1) / elapsed
+        result = {key: round(total / len(window) * ACCELERATION_SCALE, 3) for key, total in zip(ACCELERATION_KEYS, sums)}
+        result[ACCELERATION_PEAK_KEY] = round(math.sqrt(peak) * ACCELERATION_SCALE, 3)
+        return result
+
+    def _aggregate_orientation(self) -> dict[str, float]:
+        ring = self.orientation
+        window = self._window(ring, self._orientation_done)
+        self._orientation_done = ring.count
+        if not window:
+            return {}
+        # The orientation is a position, the latest one is published
+        offset = window[-1] % ring.size * IMU_AXES
+        values = ring.values()
+        return {key: round(values[offset + axis] * ORIENTATION_SCALE, 2) for axis, key in enumerate(ORIENTATION_KEYS)}
+
+    def aggregate(self) -> dict[str, float]:
+        """ Mean and peak acceleration in g and latest orientation in degrees, only the keys that got samples """
+        return {**self._aggregate_acceleration(), **self._aggregate_orientation()}
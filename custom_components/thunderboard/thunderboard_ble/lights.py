@@ -3,11 +3,18 @@ RGB lights controller for Thunderboard Sense 2 BLE advertisements.
 """
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import dataclasses
+import functools
 import logging
+import math
 import struct
-from typing import Tuple
+import time
+from typing import Any, Callable, Optional, Tuple
+from .codec import ThunderboardCharacteristicCodec
 from .models import ThunderboardLightsState
-from bleak import BleakClient, BLEDevice
+from bleak import BleakClient, BleakError, BLEDevice
 from bleak_retry_connector import establish_connection
 from sensor_state_data.enum import StrEnum
 import colorsys
@@ -16,6 +23,13 @@ _LOGGER = logging.getLogger(__name__)
 
 from .const import CHARACTERISTIC_RGB_LEDS_1
 
+# Shortest time between two writes of the LEDs, the commands received in between are coalesced
+DEFAULT_MIN_WRITE_INTERVAL = 0.1
+# Frames per second of the effects, a LED write with response takes about two connection intervals
+DEFAULT_EFFECT_FPS = 10
+# LED writes in flight at the same time for a group command, each board has its own connection
+DEFAULT_GROUP_PARALLEL = 4
+
 class ThunderboardLights(StrEnum):
     RGB_LEDS_1          = "rgb_leds_1"
 
@@ -46,22 +60,135 @@ THUNDERBOARD_GATT_LIGHTS_CHARS = [
     }
 ]
 
+def parse_rgb_leds_state(values: Tuple[int, int, int, int]) -> ThunderboardLightsState:
+    """ Build the lights state from the unpacked mask and RGB values """
+    mask, r, g, b = values
+    # Brightness is the HSV value of the color, which is the largest component
+    return ThunderboardLightsState(rgb=(r, g, b), mode=mask, brightness=max(r, g, b))
+
+class ThunderboardLightsEffect(StrEnum):
+    COLOR_CYCLE         = "color_cycle"
+    BREATHING           = "breathing"
+    CHASE               = "chase"
+    BLINK               = "blink"
+
+def _leds_mode(leds: set[int]) -> int:
+    return next(mode for mode, on in THUNDERBOARD_GATT_LIGHTS_CHARS[0]["modes"].items() if set(on) == set(leds))
+
+ALL_LEDS_MODE = _leds_mode({1, 2, 3, 4})
+
+def _color_cycle_frame(base: ThunderboardLightsState, t: float) -> ThunderboardLightsState:
+    # A full turn of the hue every 6 seconds
+    r, g, b = colorsys.hsv_to_rgb(t / 6 % 1, 1, 1)
+    return dataclasses.replace(base, mode=ALL_LEDS_MODE, rgb=(int(r * 255), int(g * 255), int(b * 255)))
+
+def _breathing_frame(base: ThunderboardLightsState, t: float) -> ThunderboardLightsState:
+    # Breath in and out every 4 seconds, never fully off
+    level = 0.05 + 0.95 * (0.5 - 0.5 * math.cos(2 * math.pi * t / 4))
+    return dataclasses.replace(base, mode=ALL_LEDS_MODE, brightness=max(1, int(base.brightness * level)))
+
+def _chase_frame(base: ThunderboardLightsState, t: float) -> ThunderboardLightsState:
+    # One LED at a time, 4 steps per second
+    return dataclasses.replace(base, mode=_leds_mode({int(t * 4) % 4 + 1}))
+
+def _blink_frame(base: ThunderboardLightsState, t: float) -> ThunderboardLightsState:
+    return dataclasses.replace(base, mode=ALL_LEDS_MODE if int(t * 2) % 2 == 0 else _leds_mode(set()))
+
+# Frame of each effect at t seconds from its start, from the state set when the effect started
+THUNDERBOARD_LIGHTS_EFFECTS: dict[str, Callable[[ThunderboardLightsState, float], ThunderboardLightsState]] = {
+    ThunderboardLightsEffect.COLOR_CYCLE: _color_cycle_frame,
+    ThunderboardLightsEffect.BREATHING: _breathing_frame,
+    ThunderboardLightsEffect.CHASE: _chase_frame,
+    ThunderboardLightsEffect.BLINK: _blink_frame,
+}
+
+THUNDERBOARD_GATT_LIGHTS_CODECS = [
+    ThunderboardCharacteristicCodec(
+        key=c["light_key"],
+        uuid=c["uuid"],
+        fmt=struct.Struct(c["format"]),
+        post=parse_rgb_leds_state,
+    )
+    for c in THUNDERBOARD_GATT_LIGHTS_CHARS
+]
+
+@functools.lru_cache(maxsize=256)
+def encode_rgb_leds(mode: int, rgb: Tuple[int, int, int], brightness: int) -> bytes:
+    """ Payload of the LEDs, the color is scaled to the brightness as its HSV value """
+    r, g, b = rgb
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    v *= brightness / 255
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+    return THUNDERBOARD_GATT_LIGHTS_CODECS[0].fmt.pack(mode, int(r * 255), int(g * 255), int(b * 255))
+
+def encode_lights_state(state: ThunderboardLightsState) -> bytes:
+    return encode_rgb_leds(state.mode, tuple(state.rgb), state.brightness)
+
 class ThunderboardLightsController:
+    """Write the LEDs state, only the newest command waiting is written and one write is in flight at a time."""
+
     def __init__(
         self,
         logger: logging.Logger,
         client: BleakClient,
+        min_write_interval: float = DEFAULT_MIN_WRITE_INTERVAL,
     ):
         super().__init__()
         self.logger = logger
         self.client = client
+        self.min_write_interval = min_write_interval
         self._state = ThunderboardLightsState()
+        # Newest state waiting to be written and the callers waiting for it, then the state being written
+        self._pending: Optional[ThunderboardLightsState] = None
+        self._pending_waiters: list[asyncio.Future] = []
+        self._in_flight: Optional[ThunderboardLightsState] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._written_at: Optional[float] = None
+        self.commands = 0
+        self.writes = 0
+        # Running effect, its frames are written by the effect task
+        self._effect: Optional[str] = None
+        self._effect_task: Optional[asyncio.Task] = None
+        self._effect_stats: dict[str, Any] = {}
         
     @classmethod
     async def from_ble_device(cls, logger: logging.Logger, ble_device: BLEDevice):
         client = await establish_connection(BleakClient, ble_device, ble_device.address)
         return cls(logger, client)
 
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "commands": self.commands,
+            "writes": self.writes,
+            "coalesced": self.commands - self.writes,
+            "effect": self._effect,
+            **self._effect_stats,
+        }
+
+    @property
+    def effect(self) -> Optional[str]:
+        return self._effect
+
+    @property
+    def state(self) -> ThunderboardLightsState:
+        """ The newest state commanded, otherwise the last one read from or written to the device """
+        return self._pending or self._in_flight or self._state
+
+    @property
+    def confirmed_state(self) -> ThunderboardLightsState:
+        """ The last state read from or written to the device """
+        return self._state
+
+    @state.setter
+    def state(self, state: ThunderboardLightsState) -> None:
+        self._state = state
+
+    def _connection(self) -> contextlib.AbstractAsyncContextManager:
+        """ Keep the connection of a device session for the writes, leased when the polls released it """
+        connection = getattr(self.client, "connection", None)
+        return connection() if connection is not None else contextlib.nullcontext()
+
     def get_mode(self, leds_to_turn_on: set[int]) -> int:
         modes = THUNDERBOARD_GATT_LIGHTS_CHARS[0]["modes"]
         for mode_val, leds in modes.items():
@@ -70,52 +197,204 @@ class ThunderboardLightsController:
                 return mode
 
     def _parse_ble_leds_state(self, data) -> ThunderboardLightsState:
-        if len(data) != 4:
+        codec = THUNDERBOARD_GATT_LIGHTS_CODECS[0]
+        if len(data) != codec.fmt.size:
             return None
 
-        mask, r, g, b = struct.unpack('BBBB', data)
-        h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
-        self._state.rgb = (r, g, b)
-        self._state.mode = mask
-        self._state.brightness = int(v * 255)
+        self._state = codec.decode(data)
         return self._state
 
     async def get_rgb_leds_state(self) -> ThunderboardLightsState:            
-        c = THUNDERBOARD_GATT_LIGHTS_CHARS[0]
-        payload = await self.client.read_gatt_char(c["uuid"])
+        codec = THUNDERBOARD_GATT_LIGHTS_CODECS[0]
+        async with self._connection():
+            payload = await self.client.read_gatt_char(codec.uuid)
         state = self._parse_ble_leds_state(payload)
         self._state = state
         self.logger.debug("Successfully read lights GATT characteristics, controller")
         return state
     
-    def _get_rgb_with_brightness(self, rgb, brightness) -> Tuple[int, int, int]:
-        r, g, b = rgb
-        h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
-        v *= brightness / 255
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        return int(r * 255), int(g * 255), int(b * 255)
-
-    async def _set_rgb_leds_state(self, state: ThunderboardLightsState) -> ThunderboardLightsState:
-        c = THUNDERBOARD_GATT_LIGHTS_CHARS[0]
-        r, g, b = self._get_rgb_with_brightness(state.rgb, state.brightness)
-        payload = struct.pack(c["format"], state.mode, r, g, b)
+    async def _write_rgb_leds_state(self, state: ThunderboardLightsState) -> Optional[ThunderboardLightsState]:
+        codec = THUNDERBOARD_GATT_LIGHTS_CODECS[0]
         try:
-            await self.client.write_gatt_char(c["uuid"], payload)
+            async with self._connection():
+                await self.client.write_gatt_char(codec.uuid, encode_lights_state(state))
             self._state = state
             return state
         except Exception as e:
             self.logger.error(e)
-    
+
+    async def _write_pending(self) -> None:
+        while self._pending is not None:
+            if self._written_at is not None:
+                # The commands received while waiting replace the pending one
+                await asyncio.sleep(self.min_write_interval - (time.monotonic() - self._written_at))
+            state, waiters = self._pending, self._pending_waiters
+            self._pending, self._pending_waiters = None, []
+            self._in_flight = state
+            try:
+                self.writes += 1
+                result = await self._write_rgb_leds_state(state)
+            finally:
+                self._in_flight = None
+                self._written_at = time.monotonic()
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+
+    async def _set_rgb_leds_state(self, state: ThunderboardLightsState) -> Optional[ThunderboardLightsState]:
+        """ Write the state, replacing the one waiting if any. Return the state written, None if the write failed """
+        self.commands += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending = state
+        self._pending_waiters.append(waiter)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._write_pending())
+        return await waiter
+
+    async def _run_effect(self, effect: str, base: ThunderboardLightsState, fps: float) -> None:
+        """ Write the frames at their deadline, the frames whose deadline passed during a slow write are dropped.
+
+        The effect stops when a frame can't be written because the connection was lost, or can't be leased.
+        """
+        frame_of = THUNDERBOARD_LIGHTS_EFFECTS[effect]
+        codec = THUNDERBOARD_GATT_LIGHTS_CODECS[0]
+        frame_time = 1 / fps
+        stats = self._effect_stats = {"frames": 0, "dropped": 0, "fps": 0.0, "lateness": 0.0, "jitter": 0.0}
+        # Running mean and sum of the squared deviations of the lateness, see Welford's algorithm
+        squared_deviations = 0.0
+        try:
+            # The frames share one connection, the polls can't release it while the effect runs
+            async with self._connection():
+                start = time.monotonic()
+                index = 0
+                while True:
+                    deadline = start + index * frame_time
+                    await asyncio.sleep(deadline - time.monotonic())
+                    sent_at = time.monotonic()
+                    frame = frame_of(base, deadline - start)
+                    try:
+                        await self.client.write_gatt_char(codec.uuid, encode_lights_state(frame))
+                    except BleakError as e:
+                        self.logger.debug("Effect %s stopped, frame not written: %s", effect, e)
+                        self._effect = None
+                        return
+                    except Exception as e:
+                        self.logger.debug("Effect frame not written: %s", e)
+                    stats["frames"] += 1
+                    # Lateness is the average delay of the frames after their deadline, jitter its standard deviation
+                    lateness = sent_at - deadline
+                    delta = lateness - stats["lateness"]
+                    stats["lateness"] += delta / stats["frames"]
+                    squared_deviations += delta * (lateness - stats["lateness"])
+                    stats["jitter"] = math.sqrt(squared_deviations / stats["frames"])
+                    stats["fps"] = stats["frames"] / max(time.monotonic() - start, frame_time)
+                    # Next frame still ahead, skipping the ones that are already late
+                    next_index = max(index + 1, math.ceil((time.monotonic() - start) / frame_time))
+                    stats["dropped"] += next_index - index - 1
+                    index = next_index
+        except BleakError as e:
+            self.logger.debug("Effect %s stopped, no connection: %s", effect, e)
+            self._effect = None
+
+    async def start_effect(
+        self,
+        effect: str,
+        rgb=(255,255,255),
+        brightness=255,
+        fps: float = DEFAULT_EFFECT_FPS,
+    ) -> ThunderboardLightsState:
+        """ Run the effect over the given color and brightness until another command """
+        await self.stop_effect()
+        # The lights are on with the base color while the effect runs
+        state = await self.turn_all_on(rgb, brightness)
+        if state is None:
+            return None
+        self.logger.debug("Start RGB effect %s at %s frames per second", effect, fps)
+        self._effect = effect
+        self._effect_task = asyncio.get_running_loop().create_task(self._run_effect(effect, state, fps))
+        return state
+
+    async def stop_effect(self) -> None:
+        """ Stop the running effect, the LEDs show its last frame until the next command """
+        if self._effect_task is None:
+            return
+        self._effect_task.cancel()
+        try:
+            await self._effect_task
+        except asyncio.CancelledError:
+            pass
+        self._effect_task = None
+        self._effect = None
+
+    async def set_state(self, state: ThunderboardLightsState) -> Optional[ThunderboardLightsState]:
+        """ Write the state as is, stopping the running effect """
+        await self.stop_effect()
+        return await self._set_rgb_leds_state(dataclasses.replace(state))
+
     async def turn_all_on(self, rgb=(255,255,255), brightness=255)-> ThunderboardLightsState:
-        mode = self.get_mode({1, 2, 3, 4})
-        self._state.mode = mode
-        self._state.rgb = rgb
-        self._state.brightness = brightness
-        self.logger.debug("Send RGB all ON state to device: %s", self._state)
-        return await self._set_rgb_leds_state(self._state)
+        state = dataclasses.replace(self.state, mode=self.get_mode({1, 2, 3, 4}), rgb=rgb, brightness=brightness)
+        self.logger.debug("Send RGB all ON state to device: %s", state)
+        return await self.set_state(state)
 
     async def turn_all_off(self)-> ThunderboardLightsState:
-        mode = self.get_mode({})
-        self._state.mode = mode
-        self.logger.debug("Send RGB all OFF state to device: %s", self._state)
-        return await self._set_rgb_leds_state(self._state)
\ No newline at end of file
+        state = dataclasses.replace(self.state, mode=self.get_mode({}))
+        self.logger.debug("Send RGB all OFF state to device: %s", state)
+        return await self.set_state(state)
+
+
+class ThunderboardLightsGroup:
+    """Set the same state on the LEDs of many boards, with a bounded number of writes in parallel."""
+
+    def __init__(
+        self,
+        logger: logging.Logger = _LOGGER,
+        max_parallel: int = DEFAULT_GROUP_PARALLEL,
+    ):
+        super().__init__()
+        self.logger = logger
+        self.max_parallel = max_parallel
+        self.commands = 0
+        # Seconds from the start of the last command until each board was written, None when it failed
+        self.last_timings: dict[str, Optional[float]] = {}
+
+    @property
+    def skew(self) -> Optional[float]:
+        """ Time between the first and the last board written by the last command """
+        timings = [timing for timing in self.last_timings.values() if timing is not None]
+        return max(timings) - min(timings) if timings else None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "commands": self.commands,
+            "skew": self.skew,
+            "failed": [address for address, timing in self.last_timings.items() if timing is None],
+            "last_timings": dict(self.last_timings),
+        }
+
+    async def set_state(
+        self,
+        controllers: dict[str, ThunderboardLightsController],
+        state: ThunderboardLightsState,
+    ) -> dict[str, Optional[float]]:
+        """ Write the state to the controllers by address, return the seconds each board took from the start """
+        self.commands += 1
+        # Encoded once, every controller gets the cached payload
+        encode_lights_state(state)
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        start = time.monotonic()
+
+        async def _set_state(address: str, controller: ThunderboardLightsController) -> tuple[str, Optional[float]]:
+            async with semaphore:
+                try:
+                    written = await controller.set_state(state)
+                except Exception as e:
+                    self.logger.error("Error when setting the lights of %s: %s", address, e)
+                    written = None
+            return address, time.monotonic() - start if written is not None else None
+
+        self.last_timings = dict(await asyncio.gather(
+            *(_set_state(address, controller) for address, controller in controllers.items())
+        ))
+        self.logger.debug("Lights of %d boards set, skew %s", len(controllers), self.skew)
+        return self.last_timings
\ No newline at end of file
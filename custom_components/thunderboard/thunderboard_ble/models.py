@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import Optional
+from typing import Any, Optional
 
 
 @dataclasses.dataclass
@@ -23,6 +23,16 @@ class ThunderboardDevice:
         default_factory=lambda: {}
     )
     rssi: int = None
+    # Wall clock time of the last value of each key, and the error of the keys that failed the last poll.
+    # Not compared, a fresh read of the same values is not a change.
+    timestamps: dict[str, float] = dataclasses.field(
+        default_factory=lambda: {}, compare=False
+    )
+    errors: dict[str, str] = dataclasses.field(
+        default_factory=lambda: {}, compare=False
+    )
+    # Error of the last poll as a whole, the values are the ones kept from before it
+    error: Optional[str] = None
 
     def friendly_name(self) -> str:
         """Generate a name for the device."""
@@ -39,4 +49,13 @@ class ThunderboardLightsState:
 
     @property
     def power(self) -> bool:
-        return bool(self.mode & 1)
\ No newline at end of file
+        return bool(self.mode & 1)
+
+@dataclasses.dataclass
+class ThunderboardReading:
+    """A single value streamed from the Thunderboard device"""
+
+    key: str
+    value: Any
+    timestamp: float
+    notified: bool = True
\ No newline at end of file
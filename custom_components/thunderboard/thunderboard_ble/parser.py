@@ -7,14 +7,26 @@ from __future__ import annotations
 import logging
 import struct
 import asyncio
-from typing import Callable
+import time
+from typing import AsyncIterator, Callable, Iterable
 
 from bleak import BleakError, BLEDevice, BleakClient
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 import bleak_retry_connector
 
-from .lights import ThunderboardLightsController
-from .models import ThunderboardDevice
+from .codec import ThunderboardCharacteristicCodec, ThunderboardCodecRegistry, divide_by, identity
+from .lights import THUNDERBOARD_GATT_LIGHTS_CODECS
+from .models import ThunderboardDevice, ThunderboardReading
+from .pipeline import ThunderboardOperationPriority
+from .session import ThunderboardDeviceSession
+from .stream import (
+    DEFAULT_STREAM_READ_INTERVAL,
+    ThunderboardReadingBuffer,
+)
+from .pool import ThunderboardConnectionPool, get_adapter
+from .refresh import ThunderboardRefreshSchedule
+from .imu import ThunderboardImuStream
+from .rssi import DEFAULT_MIN_RSSI, ThunderboardSignalTracker
 
 from sensor_state_data import SensorDeviceClass, Units
 from sensor_state_data.enum import StrEnum
@@ -37,6 +49,9 @@ from .const import (
     CHARACTERISTIC_FIRMWARE_REV,
     CHARACTERISTIC_HANDLE_DIGITAL_STATE_0,
     CHARACTERISTIC_HANDLE_DIGITAL_STATE_1,
+    CHARACTERISTIC_ACCELERATION,
+    CHARACTERISTIC_ORIENTATION,
+    CHARACTERISTIC_IMU_CONTROL_POINT,
 )
 
 class ThunderboardSensor(StrEnum):
@@ -52,6 +67,20 @@ class ThunderboardSensor(StrEnum):
     SOUND_LEVEL_DBA     = "sound_level"
     AMBIENT_LIGHT_LX    = "ambient_light"
     HALL_FIELD_UT       = "hall_field_strenght"
+    # IMU aggregates
+    ACCELERATION_X_G    = "acceleration_x"
+    ACCELERATION_Y_G    = "acceleration_y"
+    ACCELERATION_Z_G    = "acceleration_z"
+    ACCELERATION_PEAK_G = "acceleration_peak"
+    ORIENTATION_ALPHA   = "orientation_alpha"
+    ORIENTATION_BETA    = "orientation_beta"
+    ORIENTATION_GAMMA   = "orientation_gamma"
+    # IMU features
+    VIBRATION_RMS_G     = "vibration_rms"
+    VIBRATION_PEAK_G    = "vibration_peak"
+    VIBRATION_CREST_FACTOR = "vibration_crest_factor"
+    VIBRATION_FREQUENCY_HZ = "vibration_frequency"
+    TILT                = "tilt"
     
 class ThunderboardBinarySensor(StrEnum):
     # Power
@@ -204,6 +233,36 @@ DIGITAL_STATE_0_MAP = {
 
 sensors_characteristics_uuid_str = [str(sensor_info["uuid"]) for sensor_info in THUNDERBOARD_GATT_SENSOR_CHARS]
 
+# Raw values that are mapped to something else after scaling
+THUNDERBOARD_VALUE_MAPS = {
+    ThunderboardBinarySensor.POWER_SOURCE: POWER_SOURCE_MAP,
+    ThunderboardBinarySensor.DIGITAL_STATE_0: DIGITAL_STATE_0_MAP,
+}
+
+def _compile_codec(c: dict, **kwargs) -> ThunderboardCharacteristicCodec:
+    value_map = THUNDERBOARD_VALUE_MAPS.get(c["sensor_key"])
+    return ThunderboardCharacteristicCodec(
+        key=c["sensor_key"],
+        fmt=struct.Struct(c.get("format", "B")),
+        scale=divide_by(c.get("divider")),
+        post=value_map.__getitem__ if value_map else identity,
+        **kwargs,
+    )
+
+# The descriptor tables compiled once, the handles are resolved per connection by ThunderboardCodecRegistry
+THUNDERBOARD_GATT_SENSOR_CODECS = [_compile_codec(c, uuid=c["uuid"]) for c in THUNDERBOARD_GATT_SENSOR_CHARS]
+THUNDERBOARD_GATT_DIGITAL_STATE_CODECS = [_compile_codec(c, handle=c["handle"]) for c in THUNDERBOARD_GATT_DIGITAL_STATE_CHARS]
+
+# Service data keyed by a sensor characteristic UUID carries the same payload as the characteristic.
+# The stock demo firmware only advertises its name and manufacturer id, so the sensors need a connection.
+THUNDERBOARD_ADVERTISED_CODECS = {codec.uuid: codec for codec in THUNDERBOARD_GATT_SENSOR_CODECS}
+
+# Longest wait for a single characteristic read, and for all the reads of a poll
+DEFAULT_READ_TIMEOUT = 5.0
+DEFAULT_CYCLE_BUDGET = 20.0
+# Errors of a payload that was read, reading it again gives the same error
+DECODE_ERRORS = (KeyError, ValueError, struct.error)
+
 @contextmanager
 def override_bleak_retry_constants(bleak_timeout: float, bleak_safety_timeout: float):
     original_bleak_timeout = bleak_retry_connector.BLEAK_TIMEOUT
@@ -224,23 +283,191 @@ class ThunderboardBluetoothDeviceData:
     def __init__(
         self,
         logger: logging.Logger,
+        max_in_flight: int | None = None,
+        pool: ThunderboardConnectionPool | None = None,
+        device_info: dict[str, str] | None = None,
+        handle_map: dict[str, int] | None = None,
+        refresh_policies: dict[str, float | None] | None = None,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        cycle_budget: float = DEFAULT_CYCLE_BUDGET,
+        min_rssi: float | None = DEFAULT_MIN_RSSI,
     ):
         super().__init__()
         self.logger = logger
         self._client = None
         self._device = None
+        self._registry = None
+        # Polls, lights and notifications share the connection through the session.
+        # None will use the default for the bleak backend, see pipeline.MAX_IN_FLIGHT_BY_BACKEND
+        self._session = ThunderboardDeviceSession(logger, max_in_flight)
+        # Shared with the other devices when given, otherwise each update connects and disconnects
+        self._pool = pool
+        # Polls and leases using the session connection, it's detached when the last one ends unless kept
+        self._session_users = 0
+        self._session_kept = False
+        # Device and connection arguments of the last poll, to lease a connection between the polls
+        self._connect_args = None
+        if pool is not None:
+            # The light commands sent while the polls released the connection lease one from the pool
+            self._session.connector = self._lease_session
+        # Device information strings from a previous run, checked once against the firmware revision
+        self._device_info = dict(device_info) if device_info else None
+        self._device_info_verified = False
+        # Characteristic handles from a previous run, validated when used
+        self._handle_map = dict(handle_map) if handle_map else None
+        # Services of the last connection, given back to bleak to skip the discovery on reconnect
+        self._services = None
+        # Which characteristics are due on each poll, see refresh.THUNDERBOARD_REFRESH_POLICIES
+        self._refresh = ThunderboardRefreshSchedule(refresh_policies)
+        self._read_keys: set[str] = set()
+        # Errors of the last poll by key, the values read before are kept
+        self._read_errors: dict[str, BaseException] = {}
+        self.read_timeout = read_timeout
+        self.cycle_budget = cycle_budget
+        # Smoothed RSSI of the advertisements, by adapter
+        self._signal = ThunderboardSignalTracker(min_rssi)
+        # Called when the connection kept for the session is lost, not when it's closed on purpose
+        self.disconnected_callback: Callable[[], None] | None = None
+        # Connections established, to estimate the energy used by the board
+        self._connects = 0
+        self._connect_failures = 0
+        self._connect_time = 0.0
+        # Single flight of the updates, callers during a read share it or its one follow-up read
+        self._update_task: asyncio.Future | None = None
+        self._follow_up_task: asyncio.Future | None = None
+        # Set when the data is invalidated during a read, the next callers need a read started after it
+        self._stale_in_flight = False
+        self._update_stats = {"reads": 0, "shared": 0, "merged": 0}
+        # Sensor keys decoded from advertisements at least once
+        self._advertised_keys: set[str] = set()
+
+    @property
+    def device(self) -> ThunderboardDevice | None:
+        return self._device
+
+    @property
+    def keys_not_advertised(self) -> set[str]:
+        """ The sensor keys that were never decoded from an advertisement, they need a connection """
+        return {str(c["sensor_key"]) for c in THUNDERBOARD_GATT_SENSOR_CHARS} - self._advertised_keys
+
+    def update_from_advertisement(
+        self,
+        address: str,
+        service_data: dict[str, bytes],
+        rssi: int | None = None,
+        source: str | None = None,
+    ) -> ThunderboardDevice:
+        """ Decode the values advertised by the board into the device, without connecting """
+        if self._device is None:
+            self._device = ThunderboardDevice(address=address)
+        self._signal.record(rssi, source)
+        if self._signal.rssi is not None:
+            self._device.rssi = self._signal.rssi
+        for uuid, payload in service_data.items():
+            codec = THUNDERBOARD_ADVERTISED_CODECS.get(str(uuid).lower())
+            if codec is None or len(payload) != codec.fmt.size:
+                continue
+            try:
+                self._device.sensors[str(codec.key)] = codec.decode(payload)
+            except KeyError as err:
+                self.logger.debug("Unknown advertised value for %s: %s", codec.key, err)
+                continue
+            self._device.timestamps[str(codec.key)] = time.time()
+            self._advertised_keys.add(str(codec.key))
+        return self._device
 
-    async def _read_device_characteristics(self) -> ThunderboardDevice:
+    @property
+    def session(self) -> ThunderboardDeviceSession:
+        return self._session
+
+    @property
+    def signal(self) -> ThunderboardSignalTracker:
+        return self._signal
+
+    @property
+    def connects(self) -> int:
+        return self._connects
+
+    @property
+    def update_stats(self) -> dict[str, int]:
+        """ Reads started, callers that shared a read in flight and callers merged into a follow-up read """
+        return dict(self._update_stats)
+
+    @property
+    def connect_stats(self) -> dict[str, float]:
+        attempts = self._connects + self._connect_failures
+        return {
+            "connects": self._connects,
+            "failures": self._connect_failures,
+            "avg_time_to_connect": self._connect_time / attempts if attempts else 0.0,
+        }
+
+    @property
+    def last_read_count(self) -> int:
+        """ Number of characteristics read by the last poll """
+        return len(self._read_keys)
+
+    @property
+    def refresh_schedule(self) -> ThunderboardRefreshSchedule:
+        return self._refresh
+
+    @property
+    def device_info(self) -> dict[str, str] | None:
+        """ The cached device information strings, to be persisted between runs """
+        return dict(self._device_info) if self._device_info else None
+
+    @property
+    def handle_map(self) -> dict[str, int] | None:
+        """ The characteristic handles by key, to be persisted between runs """
+        return dict(self._handle_map) if self._handle_map else None
+
+    def invalidate_device_info(self) -> None:
+        """ Read again all the device information strings and all the values on the next update """
+        self._device_info = None
+        self._refresh.invalidate()
+        if self._update_task is not None and not self._update_task.done():
+            self._stale_in_flight = True
+
+    def _apply_device_info(self, device_info: dict[str, str]) -> None:
+        for key, val in device_info.items():
+            setattr(self._device, key, val)
+
+    async def _is_device_info_valid(self) -> bool:
+        if self._device_info is None:
+            return False
+        if self._device_info_verified:
+            return True
+        # Only the firmware revision is read to validate the cache, once per run
+        payload = await self._session.read_gatt_char(CHARACTERISTIC_FIRMWARE_REV, ThunderboardOperationPriority.POLL)
+        self._device_info_verified = True
+        firmware_rev = payload.decode('utf-8')
+        if firmware_rev != self._device_info.get(str(ThunderboardDeviceInfo.FIRMWARE_REV)):
+            self.logger.debug("Firmware revision changed to %s, reading device characteristics", firmware_rev)
+            # The GATT table can change with the firmware
+            self._handle_map = None
+            self._services = None
+            self._refresh.invalidate()
+            return False
+        return True
+
+    async def _read_device_info(self) -> None:
+        if not await self._is_device_info_valid():
+            # Parse and set the identity of the Thunderboard
+            payloads = await self._session.read_many(c["uuid"] for c in THUNDERBOARD_GATT_DEVICE_CHARS)
+            self._device_info = {
+                str(c["sensor_key"]): payload.decode('utf-8')
+                for c, payload in zip(THUNDERBOARD_GATT_DEVICE_CHARS, payloads)
+            }
+            self._device_info_verified = True
+
+    async def _read_device_characteristics(self, deadline: float) -> ThunderboardDevice:
         self._device.address = self._client.address
 
         # We need to fetch model to determ what to fetch.
         try:
-            # Parse and set the identity of the Thunderboard
-            for c in THUNDERBOARD_GATT_DEVICE_CHARS:
-                payload = await self._client.read_gatt_char(c["uuid"])
-                val = payload.decode('utf-8')
-                setattr(self._device, str(c["sensor_key"]), val)                
-        except BleakError as err:
+            await asyncio.wait_for(self._read_device_info(), max(0.0, deadline - time.monotonic()))
+            self._apply_device_info(self._device_info)
+        except (BleakError, asyncio.TimeoutError) as err:
             self.logger.debug("Get device characteristics exception: %s", err)
             return self._device
 
@@ -250,34 +477,115 @@ class ThunderboardBluetoothDeviceData:
         
         return self._device
 
-    async def _read_gatt_sensor_char(self, uuid, format, divider) -> None:
-        """ Get the payload value from the characteristic, processed """
-        char = self._client.services.get_characteristic(uuid)
-        payload = await self._client.read_gatt_char(char)
-        value = struct.unpack(format, payload)[0]
-        if uuid == CHARACTERISTIC_POWER_SOURCE:
-            value = POWER_SOURCE_MAP[value]
-        if divider:
-            return value / divider
-        return value
-
-    async def _read_service_characteristics(self) -> ThunderboardDevice:
-        sensors_values = {}
-        for c in THUNDERBOARD_GATT_SENSOR_CHARS:
-            val = await self._read_gatt_sensor_char(c["uuid"], c["format"], c["divider"])
-            sensors_values[str(c["sensor_key"])] = val
-        self._device.sensors.update(sensors_values)
-        self.logger.debug("Successfully read active GATT characteristics")
+    def _resolve_registry(self, services) -> ThunderboardCodecRegistry:
+        """ Resolve the codecs against the services, by the known handles first """
+        codecs = dict(
+            sensors=THUNDERBOARD_GATT_SENSOR_CODECS,
+            digitals=THUNDERBOARD_GATT_DIGITAL_STATE_CODECS,
+            lights=THUNDERBOARD_GATT_LIGHTS_CODECS,
+        )
+        try:
+            return ThunderboardCodecRegistry(services, handle_map=self._handle_map, **codecs)
+        except KeyError as err:
+            self.logger.debug("Known characteristic handles don't match, resolving by UUID: %s", err)
+            return ThunderboardCodecRegistry(services, **codecs)
+
+    def _get_registry(self) -> ThunderboardCodecRegistry:
+        """ Resolve the codecs once per discovered services collection """
+        services = self._client.services
+        if self._registry is None or self._registry.services is not services:
+            self._registry = self._resolve_registry(services)
+            self._handle_map = self._registry.handle_map
+            self._services = services
+        return self._registry
+
+    def _forget_handle_map(self) -> None:
+        """ Resolve again the characteristics by UUID from freshly discovered services """
+        self._registry = None
+        self._handle_map = None
+        self._services = None
+
+    def _select_due(self, codecs: list[ThunderboardCharacteristicCodec]) -> list[ThunderboardCharacteristicCodec]:
+        due = set(self._refresh.select(str(codec.key) for codec in codecs))
+        return [codec for codec in codecs if str(codec.key) in due]
+
+    async def _read_within_deadline(
+        self,
+        codecs: list[ThunderboardCharacteristicCodec],
+        deadline: float,
+    ) -> list[tuple[ThunderboardCharacteristicCodec, bytearray]]:
+        """ Read the characteristics pipelined, each one within the read timeout and the poll deadline """
+        async def _read(codec: ThunderboardCharacteristicCodec) -> bytearray:
+            timeout = min(self.read_timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError("Poll deadline reached")
+            return await asyncio.wait_for(
+                self._session.read_gatt_char(codec.char, ThunderboardOperationPriority.POLL), timeout
+            )
+
+        results = await asyncio.gather(*(_read(codec) for codec in codecs), return_exceptions=True)
+        payloads = []
+        for codec, result in zip(codecs, results):
+            if isinstance(result, BaseException):
+                self._set_read_error(codec, result)
+            else:
+                payloads.append((codec, result))
+        return payloads
+
+    def _set_read_error(self, codec: ThunderboardCharacteristicCodec, error: BaseException) -> None:
+        self.logger.debug("Reading %s failed, keeping its last value: %r", codec.key, error)
+        self._read_errors[str(codec.key)] = error
+        self._device.errors[str(codec.key)] = repr(error)
+
+    def _decode_into_device(
+        self,
+        codec: ThunderboardCharacteristicCodec,
+        payload: bytearray,
+        update: Callable[[ThunderboardCharacteristicCodec, bytearray], None],
+    ) -> None:
+        try:
+            update(codec, payload)
+        except DECODE_ERRORS as err:
+            self._set_read_error(codec, err)
+            return
+        key = str(codec.key)
+        self._read_keys.add(key)
+        self._read_errors.pop(key, None)
+        self._device.errors.pop(key, None)
+        self._device.timestamps[key] = time.time()
+
+    async def _read_service_characteristics(
+        self,
+        codecs: list[ThunderboardCharacteristicCodec],
+        deadline: float,
+    ) -> ThunderboardDevice:
+        def _update(codec, payload):
+            self._device.sensors[str(codec.key)] = codec.decode(payload)
+
+        for codec, payload in await self._read_within_deadline(codecs, deadline):
+            self._decode_into_device(codec, payload, _update)
+        self.logger.debug("Successfully read active GATT characteristics: %s", [str(codec.key) for codec in codecs])
         return self._device
     
     def get_updated_buttons_state(self, payload) -> ThunderboardDevice:
-        return self._get_updated_digital_state(payload, ThunderboardBinarySensor.DIGITAL_STATE_0)
-    
-    def _get_updated_digital_state(self, payload, key) -> ThunderboardDevice:
+        return self._get_updated_digital_state(payload, self._registry.digitals[0])
+
+    def get_updated_state(self, sender, payload) -> ThunderboardDevice:
+        """ Decode a notification through the codec registry, sender is the characteristic or its handle """
+        codec = self._registry.get(sender)
+        # A notified value is as fresh as a read one
+        self._refresh.mark_read([codec.key])
+        self._device.timestamps[str(codec.key)] = time.time()
+        if codec.key in (ThunderboardBinarySensor.DIGITAL_STATE_0, ThunderboardBinarySensor.DIGITAL_STATE_1):
+            return self._get_updated_digital_state(payload, codec)
+        self._device.sensors[str(codec.key)] = codec.decode(payload)
+        return self._device
+
+    def _get_updated_digital_state(self, payload, codec: ThunderboardCharacteristicCodec) -> ThunderboardDevice:
         digital_values = {}
-        val = struct.unpack("B", payload)[0]
+        key = codec.key
+        val = codec.decode(payload)
         if key == ThunderboardBinarySensor.DIGITAL_STATE_0:
-            val = DIGITAL_STATE_0_MAP[val]
             if 0 in val:
                 digital_values[str(ThunderboardBinarySensor.BTN_0)] = True
             else:
@@ -291,38 +599,294 @@ class ThunderboardBluetoothDeviceData:
         return self._device
 
 
-    async def _read_device_digital_state(self) -> ThunderboardDevice:
-        for c in THUNDERBOARD_GATT_DIGITAL_STATE_CHARS:
-            char = self._client.services.get_characteristic(c["handle"])
-            payload = await self._client.read_gatt_char(char)
-            self._device = self._get_updated_digital_state(payload, c["sensor_key"])
+    async def _read_device_digital_state(
+        self,
+        codecs: list[ThunderboardCharacteristicCodec],
+        deadline: float,
+    ) -> ThunderboardDevice:
+        for codec, payload in await self._read_within_deadline(codecs, deadline):
+            self._decode_into_device(codec, payload, lambda codec, payload: self._get_updated_digital_state(payload, codec))
         self.logger.debug("Successfully read digital states GATT characteristics")
         return self._device
 
-    async def _read_device_lights_state(self) -> ThunderboardDevice:
-        light_controller = ThunderboardLightsController(self.logger, self._client)
-        light_state = await light_controller.get_rgb_leds_state()
-        self.logger.debug("Successfully read lights GATT characteristics")
-        self._device.lights = light_state
+    async def _read_device_lights_state(
+        self,
+        codecs: list[ThunderboardCharacteristicCodec],
+        deadline: float,
+    ) -> ThunderboardDevice:
+        # The lights controller keeps the state of the LEDs between the reads, including our own writes
+        controller = self._session.lights_controller()
+
+        def _update(codec, payload):
+            controller.state = codec.decode(payload)
+
+        for codec, payload in await self._read_within_deadline(codecs, deadline):
+            self._decode_into_device(codec, payload, _update)
+        self._device.lights = controller.state
         return self._device
 
     async def notification_on_buttons_press(self, button_state_callback: Callable) -> None:
-        c = THUNDERBOARD_GATT_DIGITAL_STATE_CHARS[0]
-        char = self._client.services.get_characteristic(c["handle"])
-        await self._client.start_notify(char, button_state_callback)
+        codec = self._registry.digitals[0]
+        await self._session.start_notify(codec.char, button_state_callback)
+
+    def _handle_imu_control_point(self, sender, payload: bytearray) -> None:
+        self.logger.debug("IMU control point indication: %s", payload.hex())
+
+    async def start_imu(self, imu: ThunderboardImuStream) -> None:
+        """ Stream the IMU samples into the rings of imu, the firmware samples the IMU while they're subscribed """
+        # The control point indications must be on before the IMU accepts commands or streams
+        await self._session.start_notify(CHARACTERISTIC_IMU_CONTROL_POINT, self._handle_imu_control_point)
+        await self._session.start_notify(CHARACTERISTIC_ACCELERATION, imu.handle_acceleration)
+        await self._session.start_notify(CHARACTERISTIC_ORIENTATION, imu.handle_orientation)
+
+    async def stop_imu(self) -> None:
+        for uuid in (CHARACTERISTIC_ACCELERATION, CHARACTERISTIC_ORIENTATION, CHARACTERISTIC_IMU_CONTROL_POINT):
+            await self._session.stop_notify(uuid)
+
+    def update_from_aggregates(self, aggregates: dict[str, float]) -> ThunderboardDevice:
+        """ Put values aggregated outside of the polling, like the IMU samples, into the device """
+        self._device.sensors.update(aggregates)
+        now = time.time()
+        self._device.timestamps.update((key, now) for key in aggregates)
+        return self._device
 
-    async def _get_client(self, ble_device: BLEDevice, scan_timeout: float = 30.0, max_attempts: int = 3) -> BleakClient:
+    async def _get_client(
+        self,
+        ble_device: BLEDevice,
+        scan_timeout: float = 30.0,
+        max_attempts: int = 3,
+        use_services_cache: bool = True,
+    ) -> BleakClient:
+        if self._pool is None:
+            return await self._connect(ble_device, scan_timeout, max_attempts, use_services_cache)
+        return await self._pool.acquire(
+            ble_device.address,
+            lambda: self._connect(ble_device, scan_timeout, max_attempts, use_services_cache),
+            get_adapter(ble_device),
+        )
+
+    async def _rediscover(self, ble_device: BLEDevice, scan_timeout: float, max_attempts: int) -> None:
+        """ Drop the connection and connect again, discovering the services instead of using the cached ones """
+        self._forget_handle_map()
+        self._session.detach()
+        if self._pool is not None:
+            await self._pool.remove(ble_device.address)
+        elif self._client is not None:
+            await self._client.disconnect()
+        self._client = await self._get_client(ble_device, scan_timeout, max_attempts, use_services_cache=False)
+        if self._client is None:
+            raise BleakError(f"Unable to connect again to Thunderboard BLE device, address: {ble_device.address}")
+        # The notifications are subscribed again on the next poll, as after any new connection
+        self._session.attach(self._client)
+
+    async def _release_client(self, ble_device: BLEDevice, keep_connect: bool) -> None:
+        self._session_users -= 1
+        self._session_kept = keep_connect
+        if not keep_connect and not self._session_users:
+            self._session.detach()
+        if self._pool is not None:
+            await self._pool.release(ble_device.address, keep_alive=keep_connect)
+        elif not keep_connect:
+            await self._client.disconnect()
+
+    @asynccontextmanager
+    async def _lease_session(self) -> AsyncIterator[None]:
+        """ Attach a pooled connection to the session while the commands sent between the polls run """
+        if self._connect_args is None:
+            raise BleakError("Thunderboard device session is not connected")
+        ble_device, scan_timeout, max_attempts = self._connect_args
+        client = await self._get_client(ble_device, scan_timeout, max_attempts)
+        if client is None:
+            raise BleakError(f"Unable to connect to Thunderboard BLE device, address: {ble_device.address}")
+        if self._session.client is not client:
+            # The notifications are subscribed again on the next poll that keeps the connection
+            self._client = client
+            self._session.attach(client)
+        self._session_users += 1
+        try:
+            yield
+        finally:
+            self._session_users -= 1
+            if not self._session_kept and not self._session_users:
+                self._session.detach()
+            # The connection stays open for the next command or poll, till the pool expires it
+            await self._pool.release(ble_device.address, keep_alive=None)
+
+    def _handle_disconnected(self, client: BleakClient) -> None:
+        if client is not self._session.client or (self._pool is not None and self._pool.closed(client)):
+            # Released after the poll, replaced or closed by the pool
+            return
+        self.logger.debug("Lost the connection to Thunderboard BLE device, address: %s", client.address)
+        if self.disconnected_callback is not None:
+            self.disconnected_callback()
+
+    async def _connect(
+        self,
+        ble_device: BLEDevice,
+        scan_timeout: float = 30.0,
+        max_attempts: int = 3,
+        use_services_cache: bool = True,
+    ) -> BleakClient:
+        started = time.monotonic()
         with override_bleak_retry_constants(bleak_timeout = scan_timeout, bleak_safety_timeout = scan_timeout * max_attempts):
             try:
                 client = await bleak_retry_connector.establish_connection(
                             client_class = BleakClient, 
                             device = ble_device, 
                             name = ble_device.address,
-                            max_attempts = max_attempts
+                            max_attempts = max_attempts,
+                            cached_services = self._services if use_services_cache else None,
+                            use_services_cache = use_services_cache,
+                            disconnected_callback = self._handle_disconnected,
                         )
+                self._connects += 1
                 return client
             except Exception as e:
+                self._connect_failures += 1
                 self.logger.error("Error when connecting to Thunderboard BLE device, address: %s\n%s", ble_device.address, str(e))
+            finally:
+                self._connect_time += time.monotonic() - started
+
+    async def _read_codecs(
+        self,
+        sensors: list[ThunderboardCharacteristicCodec],
+        lights: list[ThunderboardCharacteristicCodec],
+        digitals: list[ThunderboardCharacteristicCodec],
+        deadline: float,
+    ) -> None:
+        await asyncio.gather(
+            self._read_service_characteristics(sensors, deadline),
+            self._read_device_lights_state(lights, deadline),
+            self._read_device_digital_state(digitals, deadline),
+        )
+
+    async def _read_all(self) -> None:
+        """ Read the due characteristics within the cycle budget, the failed ones keep their last value """
+        registry = self._get_registry()
+        self._read_keys.clear()
+        self._read_errors.clear()
+        deadline = time.monotonic() + self.cycle_budget
+        codecs = (
+            self._select_due(registry.sensors),
+            self._select_due(registry.lights),
+            self._select_due(registry.digitals),
+        )
+        await asyncio.gather(
+            self._read_device_characteristics(deadline),
+            self._read_codecs(*codecs, deadline),
+        )
+
+        # Read again once the failed characteristics, if the budget allows it
+        retry = {key for key, error in self._read_errors.items() if not isinstance(error, DECODE_ERRORS)}
+        if retry and time.monotonic() < deadline:
+            self.logger.debug("Reading again %s", retry)
+            await self._read_codecs(
+                *([codec for codec in group if str(codec.key) in retry] for group in codecs), deadline
+            )
+        # Only the successful reads count as fresh, the failed ones are due again on the next poll
+        self._refresh.mark_read(self._read_keys)
+        if self._read_errors and not self._read_keys:
+            # Nothing could be read, by the known handles the GATT table might have changed
+            raise BleakError(f"Unable to read any characteristic: {list(self._read_errors)}")
+
+    async def stream(
+        self,
+        ble_device: BLEDevice,
+        keys: Iterable[str] | None = None,
+        read_interval: float = DEFAULT_STREAM_READ_INTERVAL,
+        buffer: ThunderboardReadingBuffer | None = None,
+        scan_timeout: float = 30.0,
+        max_attempts: int = 3,
+    ) -> AsyncIterator[ThunderboardReading]:
+        """Stream the sensors and digital states, from notifications where the board supports them.
+
+        Characteristics without notify are read every read_interval. The readings wait for the consumer
+        in the buffer, which applies its overflow policy when the consumer is too slow. Use
+        contextlib.aclosing to unsubscribe and release the connection as soon as the consumer stops.
+        The stream has a session of its own on the pooled connection, the polls keep theirs.
+        """
+        if buffer is None:
+            buffer = ThunderboardReadingBuffer()
+        keys = {str(key) for key in keys} if keys is not None else None
+        # A session of its own, the device session and data of the polls are left untouched
+        session = ThunderboardDeviceSession(self.logger)
+        if self._pool is not None:
+            client = await self._pool.acquire(
+                ble_device.address,
+                lambda: self._connect(ble_device, scan_timeout, max_attempts),
+                get_adapter(ble_device),
+            )
+        else:
+            client = await self._connect(ble_device, scan_timeout, max_attempts)
+        if client is None:
+            raise BleakError(f"Unable to connect to Thunderboard BLE device, address: {ble_device.address}")
+        session.attach(client)
+
+        subscribed = []
+        read_task = None
+        try:
+            registry = self._resolve_registry(client.services)
+            codecs = [*registry.sensors, *registry.digitals]
+            if keys is not None:
+                codecs = [codec for codec in codecs if str(codec.key) in keys]
+            notified = [codec for codec in codecs if "notify" in codec.char.properties]
+            read = [codec for codec in codecs if "notify" not in codec.char.properties]
+            self.logger.debug("Streaming %s from notifications, reading %s", [c.key for c in notified], [c.key for c in read])
+
+            def _notification_callback(sender, payload: bytearray) -> None:
+                try:
+                    codec = registry.get(sender)
+                    value = codec.decode(payload)
+                except DECODE_ERRORS as err:
+                    self.logger.debug("Dropping undecodable notification from %s: %r", sender, err)
+                    return
+                buffer.put(ThunderboardReading(str(codec.key), value, time.time()))
+
+            async def _read_loop() -> None:
+                try:
+                    while True:
+                        payloads = await session.read_many(codec.char for codec in read)
+                        now = time.time()
+                        for codec, payload in zip(read, payloads):
+                            try:
+                                value = codec.decode(payload)
+                            except DECODE_ERRORS as err:
+                                # Same as the notifications, a malformed payload only drops its reading
+                                self.logger.debug("Dropping undecodable read of %s: %r", codec.key, err)
+                                continue
+                            buffer.put(ThunderboardReading(str(codec.key), value, now, notified=False))
+                        await asyncio.sleep(read_interval)
+                except Exception as err:
+                    # Surface the read errors to the consumer, instead of leaving it waiting
+                    buffer.fail(err)
+
+            for codec in notified:
+                await session.start_notify(codec.char, _notification_callback)
+                subscribed.append(codec)
+            if read:
+                read_task = asyncio.create_task(_read_loop())
+            while True:
+                yield await buffer.get()
+        finally:
+            if read_task is not None:
+                read_task.cancel()
+            for codec in subscribed:
+                try:
+                    await session.stop_notify(codec.char)
+                except BleakError as err:
+                    self.logger.debug("Stop notify exception: %s", err)
+            overlap = {codec.handle for codec in subscribed} & self._session.subscriptions
+            if overlap and self._session.client is client and self._session.connected:
+                # The stream replaced the callbacks of the device session on the same connection
+                try:
+                    await self._session.resubscribe(overlap)
+                except BleakError as err:
+                    self.logger.debug("Subscribing again the device session failed: %s", err)
+            if self._pool is not None:
+                # The connection stays kept alive if the polls keep it
+                await self._pool.release(ble_device.address, keep_alive=None)
+            elif client.is_connected:
+                await client.disconnect()
 
     async def update_device(
         self, 
@@ -330,22 +894,78 @@ class ThunderboardBluetoothDeviceData:
         keep_connect: bool = False, 
         scan_timeout: float = 30.0,
         max_attempts: int = 3,
+        fresh: bool = False,
+    ) -> ThunderboardDevice:
+        """Connects to the device through BLE and retrieves relevant data.
+
+        A call made while a read is in flight shares its result. With fresh, or when the data was
+        invalidated during the read, the call waits for a read started after the current one instead,
+        all these calls share the same follow-up read. The arguments of the caller starting a read are used.
+        """
+        args = (ble_device, keep_connect, scan_timeout, max_attempts)
+        if self._follow_up_task is not None:
+            self._update_stats["merged"] += 1
+            return await asyncio.shield(self._follow_up_task)
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.ensure_future(self._update_device(*args))
+            return await asyncio.shield(self._update_task)
+        if not fresh and not self._stale_in_flight:
+            self._update_stats["shared"] += 1
+            return await asyncio.shield(self._update_task)
+        self._stale_in_flight = False
+        self._follow_up_task = asyncio.ensure_future(self._follow_up(self._update_task, args))
+        return await asyncio.shield(self._follow_up_task)
+
+    async def _follow_up(self, in_flight: asyncio.Future, args: tuple) -> ThunderboardDevice:
+        try:
+            await in_flight
+        except Exception:
+            # The callers of the read in flight get its error, the follow-up reads anyway
+            pass
+        self._update_task = asyncio.ensure_future(self._update_device(*args))
+        self._follow_up_task = None
+        return await self._update_task
+
+    async def _update_device(
+        self,
+        ble_device: BLEDevice,
+        keep_connect: bool,
+        scan_timeout: float,
+        max_attempts: int,
     ) -> ThunderboardDevice:
-        """Connects to the device through BLE and retrieves relevant data"""
+        self._update_stats["reads"] += 1
+        previous = self._device
         self._device = ThunderboardDevice()
-        # Deprecated Blake RSSI from BLEDevice, get it from AdvertisementData instead
-        self._device.rssi = ble_device._rssi or -255
-
+        if previous is not None:
+            # The values that are not due on this poll are kept from the previous ones
+            self._device.sensors.update(previous.sensors)
+            self._device.digitals.update(previous.digitals)
+            self._device.timestamps.update(previous.timestamps)
+        # Smoothed from the advertisements, the deprecated RSSI of BLEDevice is a single sample
+        self._device.rssi = self._signal.rssi
+        if self._device.rssi is None:
+            self._device.rssi = getattr(ble_device, "_rssi", None) or -255
+
+        self._connect_args = (ble_device, scan_timeout, max_attempts)
         self._client = await self._get_client(ble_device, scan_timeout, max_attempts)
+        # All the reads below share the same connection and the same in flight limit
+        self._session.attach(self._client)
+        self._session_users += 1
 
         try:
-            tasks = [
-                self._read_device_characteristics(),
-                self._read_service_characteristics(),
-                self._read_device_lights_state(),
-                self._read_device_digital_state()
-            ]
-            await asyncio.gather(*tasks)
+            if keep_connect and self._session.needs_resubscribe:
+                # A new connection, subscribe before reading so no change is missed in between
+                await self._session.resubscribe()
+            try:
+                await self._read_all()
+            except BleakError as error:
+                if not self._registry or not self._registry.from_handle_map:
+                    raise
+                # Reads by the known handles failed, the GATT table might have changed
+                self.logger.debug("Reading known handles failed, discovering services again: %s", error)
+                await self._rediscover(ble_device, scan_timeout, max_attempts)
+                self._refresh.invalidate()
+                await self._read_all()
         except BleakError as error:
             self.logger.error("Error when getting data from Thunderboard BLE device, address: %s\n%s", ble_device.address, str(error))
             self._device.error = str(error)
@@ -353,7 +973,6 @@ class ThunderboardBluetoothDeviceData:
             self.logger.error("Other error when getting data from Thunderboard BLE device, address: %s\n%s", ble_device.address, str(error))
             self._device.error = str(error)
         finally:
-            if not keep_connect:
-                await self._client.disconnect()
+            await self._release_client(ble_device, keep_connect)
 
         return self._device
\ No newline at end of file
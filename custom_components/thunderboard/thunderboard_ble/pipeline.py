@@ -0,0 +1,189 @@
+"""
+Pipelined GATT operations for Thunderboard Sense 2 BLE connections.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Iterable
+
+from bleak import BleakClient, BleakError
+
+_LOGGER = logging.getLogger(__name__)
+
+# How many GATT requests can be outstanding on one connection, by bleak backend class name.
+# BlueZ and CoreBluetooth queue requests in the stack, so keeping several in flight hides the
+# per-request round trip. Android and the ESPHome proxies are less tolerant of deep queues.
+MAX_IN_FLIGHT_BY_BACKEND = {
+    "BleakClientBlueZDBus": 4,
+    "BleakClientCoreBluetooth": 4,
+    "BleakClientWinRT": 2,
+    "BleakClientP4Android": 1,
+    "ESPHomeClient": 2,
+}
+DEFAULT_MAX_IN_FLIGHT = 2
+
+
+class ThunderboardOperationPriority(IntEnum):
+    """Lower values are sent first when the pipeline is full"""
+    USER = 0
+    NOTIFICATION = 1
+    POLL = 2
+
+
+def get_backend_name(client: BleakClient) -> str:
+    """ Get the class name of the backend used by the client """
+    backend = getattr(client, "_backend", None) or client
+    return type(backend).__name__
+
+
+def get_max_in_flight(client: BleakClient) -> int:
+    """ Get the number of GATT requests allowed in flight for the client backend """
+    return MAX_IN_FLIGHT_BY_BACKEND.get(get_backend_name(client), DEFAULT_MAX_IN_FLIGHT)
+
+
+class ThunderboardGattPipeline:
+    """Keep a bounded number of GATT requests in flight on a single connection, by priority."""
+
+    def __init__(
+        self,
+        client: BleakClient,
+        max_in_flight: int | None = None,
+    ):
+        super().__init__()
+        self.client = client
+        self.max_in_flight = max_in_flight or get_max_in_flight(client)
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.max_queue_depth = 0
+        self._wait_stats = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0} for priority in ThunderboardOperationPriority
+        }
+        _LOGGER.debug("GATT pipeline for %s allows %d requests in flight", get_backend_name(client), self.max_in_flight)
+
+    @property
+    def address(self) -> str:
+        return self.client.address
+
+    @property
+    def services(self):
+        return self.client.services
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        wait_times = {}
+        for priority, stats in self._wait_stats.items():
+            wait_times[priority.name.lower()] = {
+                "count": stats["count"],
+                "avg": stats["total"] / stats["count"] if stats["count"] else 0.0,
+                "max": stats["max"],
+            }
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_times": wait_times,
+        }
+
+    async def _acquire(self, priority: ThunderboardOperationPriority) -> None:
+        started = time.monotonic()
+        if self._in_flight < self.max_in_flight and not self.queue_depth:
+            self._in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                # The slot is handed over by _release, _in_flight is already counted
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+        waited = time.monotonic() - started
+        stats = self._wait_stats[priority]
+        stats["count"] += 1
+        stats["total"] += waited
+        stats["max"] = max(stats["max"], waited)
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _get_client(self) -> BleakClient:
+        # The session can detach the client while an operation waits for its turn
+        if self.client is None:
+            raise BleakError("GATT pipeline has no connected client")
+        return self.client
+
+    async def read_gatt_char(
+        self,
+        char_specifier: Any,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.POLL,
+        **kwargs
+    ) -> bytearray:
+        await self._acquire(priority)
+        try:
+            return await self._get_client().read_gatt_char(char_specifier, **kwargs)
+        finally:
+            self._release()
+
+    async def write_gatt_char(
+        self,
+        char_specifier: Any,
+        data: bytes,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.USER,
+        **kwargs
+    ) -> None:
+        await self._acquire(priority)
+        try:
+            await self._get_client().write_gatt_char(char_specifier, data, **kwargs)
+        finally:
+            self._release()
+
+    async def start_notify(
+        self,
+        char_specifier: Any,
+        callback,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.NOTIFICATION,
+        **kwargs
+    ) -> None:
+        await self._acquire(priority)
+        try:
+            await self._get_client().start_notify(char_specifier, callback, **kwargs)
+        finally:
+            self._release()
+
+    async def stop_notify(
+        self,
+        char_specifier: Any,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.NOTIFICATION,
+    ) -> None:
+        await self._acquire(priority)
+        try:
+            await self._get_client().stop_notify(char_specifier)
+        finally:
+            self._release()
+
+    async def read_many(
+        self,
+        char_specifiers: Iterable[Any],
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.POLL,
+    ) -> list[bytearray]:
+        """ Read all characteristics, pipelined, and return the payloads in the given order """
+        return await asyncio.gather(
+            *(self.read_gatt_char(char_specifier, priority) for char_specifier in char_specifiers)
+        )
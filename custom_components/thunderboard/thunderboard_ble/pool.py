@@ -0,0 +1,238 @@
+"""
+Connection pool shared by all the Thunderboard Sense 2 devices using the same adapters.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from bleak import BleakClient, BleakError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections open at the same time through each adapter or proxy
+DEFAULT_MAX_CONNECTIONS = 5
+DEFAULT_IDLE_TIMEOUT = 60.0
+# Seconds a caller waits for a free connection slot before failing
+DEFAULT_ACQUIRE_TIMEOUT = 30.0
+
+
+def get_adapter(ble_device: Any) -> Optional[str]:
+    """ Get the adapter or proxy that sees the device, from the Bluetooth integration details """
+    details = getattr(ble_device, "details", None)
+    return details.get("source") if isinstance(details, dict) else None
+
+
+@dataclasses.dataclass
+class _PooledConnection:
+    client: Optional[BleakClient] = None
+    source: Optional[str] = None
+    leases: int = 0
+    keep_alive: bool = False
+    released_at: float = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return self.client is not None and self.leases == 0
+
+
+class ThunderboardConnectionPool:
+    """Lease BLE clients by address, keep them warm and evict the least recently used idle ones.
+
+    The connection slots are counted by adapter or proxy. A kept alive connection carries the
+    notifications of its board, it's evicted only when no other idle connection can be, its board
+    subscribes again on its next poll. The callers wait for a leased connection up to acquire timeout.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger = _LOGGER,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+    ):
+        super().__init__()
+        self.logger = logger
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        # Ordered from the least to the most recently used
+        self._connections: OrderedDict[str, _PooledConnection] = OrderedDict()
+        self._condition = asyncio.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.timeouts = 0
+        # Clients disconnected by the pool, their disconnect is not a lost connection
+        self._closed: weakref.WeakSet[BleakClient] = weakref.WeakSet()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        by_source: dict[str, int] = {}
+        for conn in self._connections.values():
+            by_source[str(conn.source)] = by_source.get(str(conn.source), 0) + 1
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "timeouts": self.timeouts,
+            "connections": len(self._connections),
+            "connections_by_source": by_source,
+            "leased": sum(1 for conn in self._connections.values() if conn.leases),
+            "kept_alive": sum(1 for conn in self._connections.values() if conn.keep_alive),
+        }
+
+    def _count(self, source: Optional[str]) -> int:
+        return sum(1 for conn in self._connections.values() if conn.source == source)
+
+    def _pop_expired(self) -> list[BleakClient]:
+        now = time.monotonic()
+        expired = [
+            address for address, conn in self._connections.items()
+            if conn.idle and not conn.keep_alive and now - conn.released_at > self.idle_timeout
+        ]
+        self.expirations += len(expired)
+        return [self._connections.pop(address).client for address in expired]
+
+    def _pop_lru_idle(self, source: Optional[str]) -> Optional[BleakClient]:
+        idle = [address for address, conn in self._connections.items() if conn.idle and conn.source == source]
+        if not idle:
+            return None
+        # The least recently used kept alive connection goes last, its notifications are lost till its next poll
+        address = min(idle, key=lambda address: self._connections[address].keep_alive and self._connections[address].client.is_connected)
+        self.logger.debug("Evict idle connection to %s from the pool", address)
+        self.evictions += 1
+        return self._connections.pop(address).client
+
+    def closed(self, client: BleakClient) -> bool:
+        """ Whether the client was disconnected by the pool, on expiry, eviction or removal """
+        return client in self._closed
+
+    async def _disconnect(self, clients: list[BleakClient]) -> None:
+        for client in clients:
+            self._closed.add(client)
+            try:
+                await client.disconnect()
+            except Exception as e:
+                self.logger.debug("Error when disconnecting pooled client %s: %s", client.address, e)
+
+    async def acquire(
+        self,
+        address: str,
+        connect: Callable[[], Awaitable[Optional[BleakClient]]],
+        source: Optional[str] = None,
+    ) -> Optional[BleakClient]:
+        """ Get a connected client for the address, calling connect through source only when there's no warm one
+
+        Raise BleakError when no connection slot is free within acquire timeout.
+        """
+        to_close = []
+        deadline = time.monotonic() + self.acquire_timeout
+        try:
+            async with self._condition:
+                while True:
+                    to_close += self._pop_expired()
+                    conn = self._connections.get(address)
+                    if conn is not None and conn.client is None:
+                        # Someone else is connecting to the same device
+                        await self._wait(address, source, deadline)
+                        continue
+                    if conn is not None and conn.client.is_connected:
+                        self.hits += 1
+                        conn.leases += 1
+                        self._connections.move_to_end(address)
+                        return conn.client
+                    if conn is not None:
+                        del self._connections[address]
+                    if self._count(source) < self.max_connections:
+                        break
+                    if (client := self._pop_lru_idle(source)) is not None:
+                        to_close.append(client)
+                        continue
+                    self.logger.debug("No free connection slot on %s for %s, waiting", source, address)
+                    await self._wait(address, source, deadline)
+                # Reserve the slot while connecting
+                self.misses += 1
+                conn = self._connections[address] = _PooledConnection(source=source, leases=1)
+        finally:
+            await self._disconnect(to_close)
+
+        client = None
+        try:
+            client = await connect()
+        finally:
+            async with self._condition:
+                if client is None:
+                    self._connections.pop(address, None)
+                else:
+                    conn.client = client
+                self._condition.notify_all()
+        return client
+
+    async def _wait(self, address: str, source: Optional[str], deadline: float) -> None:
+        """ Wait for a change of the connections, with the condition held """
+        try:
+            await asyncio.wait_for(self._condition.wait(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise BleakError(
+                f"No free connection slot on {source} for {address} within {self.acquire_timeout} seconds"
+            ) from None
+
+    async def release(self, address: str, keep_alive: Optional[bool] = False) -> None:
+        """ Return the client, None keeps keep_alive as is
+
+        Released with keep_alive False, the client is disconnected once no one else leases it. With None,
+        a client not kept alive stays connected till it expires or its slot is needed.
+        """
+        to_close = []
+        async with self._condition:
+            conn = self._connections.get(address)
+            if conn is None or conn.client is None:
+                return
+            conn.leases = max(conn.leases - 1, 0)
+            if keep_alive is not None:
+                conn.keep_alive = keep_alive
+            conn.released_at = time.monotonic()
+            self._connections.move_to_end(address)
+            if keep_alive is False and conn.idle:
+                to_close.append(self._connections.pop(address).client)
+            self._condition.notify_all()
+        await self._disconnect(to_close)
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        address: str,
+        connect: Callable[[], Awaitable[Optional[BleakClient]]],
+        keep_alive: Optional[bool] = False,
+        source: Optional[str] = None,
+    ) -> AsyncIterator[Optional[BleakClient]]:
+        client = await self.acquire(address, connect, source)
+        try:
+            yield client
+        finally:
+            await self.release(address, keep_alive)
+
+    async def expire_idle(self, *args) -> None:
+        """ Disconnect the idle clients not used for more than idle timeout """
+        async with self._condition:
+            expired = self._pop_expired()
+            self._condition.notify_all()
+        await self._disconnect(expired)
+
+    async def remove(self, address: str) -> None:
+        """ Drop and disconnect the client of the address, even if leased """
+        async with self._condition:
+            conn = self._connections.pop(address, None)
+            self._condition.notify_all()
+        if conn is not None and conn.client is not None:
+            await self._disconnect([conn.client])
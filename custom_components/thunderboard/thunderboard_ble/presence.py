@@ -0,0 +1,103 @@
+"""
+Advertisement presence of a Thunderboard Sense 2, to connect while the board is awake.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Optional
+
+# Weight of the last advertisement gap in the learned interval and jitter
+PRESENCE_SMOOTHING = 0.2
+# A gap longer than this many intervals is the board sleeping, not a slow advertisement
+SLEEP_GAP_INTERVALS = 10
+# Time after an advertisement when a connection is expected to succeed, in intervals
+WAKE_WINDOW_INTERVALS = 1.0
+# Longest wait for the next advertisement before a connect
+DEFAULT_MAX_WAKE_WAIT = 30.0
+# Not seen for this long, the board is gone
+DEFAULT_ABSENT_TIMEOUT = 900.0
+
+
+class ThunderboardPresenceTracker:
+    """Learn the advertisement interval and jitter of a board from the advertisements seen."""
+
+    def __init__(
+        self,
+        max_wait: float = DEFAULT_MAX_WAKE_WAIT,
+        absent_timeout: float = DEFAULT_ABSENT_TIMEOUT,
+    ):
+        super().__init__()
+        self.max_wait = max_wait
+        self.absent_timeout = absent_timeout
+        self.interval: Optional[float] = None
+        self.jitter = 0.0
+        self.last_seen: Optional[float] = None
+        self.advertisements = 0
+        self.sleeps = 0
+        self._last_request: Optional[float] = None
+        self._advertised = asyncio.Event()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "advertisements": self.advertisements,
+            "sleeps": self.sleeps,
+            "seconds_since_seen": time.monotonic() - self.last_seen if self.last_seen is not None else None,
+        }
+
+    @property
+    def wake_window(self) -> Optional[float]:
+        """ Seconds after an advertisement when the board is expected to accept a connection """
+        if self.interval is None:
+            return None
+        return self.interval * WAKE_WINDOW_INTERVALS + self.jitter
+
+    def record_advertisement(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self.last_seen is not None and now > self.last_seen:
+            gap = now - self.last_seen
+            if self.interval is None:
+                self.interval = gap
+            elif gap > self.interval * SLEEP_GAP_INTERVALS:
+                self.sleeps += 1
+            else:
+                self.jitter += PRESENCE_SMOOTHING * (abs(gap - self.interval) - self.jitter)
+                self.interval += PRESENCE_SMOOTHING * (gap - self.interval)
+        self.last_seen = now
+        self.advertisements += 1
+        self._advertised.set()
+
+    def is_awake(self, now: Optional[float] = None) -> bool:
+        """ An advertisement was seen within the wake window, unknown boards are assumed awake """
+        if self.last_seen is None or self.wake_window is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.last_seen <= self.wake_window
+
+    def is_present(self, now: Optional[float] = None) -> bool:
+        if self.last_seen is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.last_seen <= self.absent_timeout
+
+    def should_request_refresh(self, debounce_time: float, now: Optional[float] = None) -> bool:
+        """ Debounce the refreshes requested from the advertisements of this board """
+        now = time.monotonic() if now is None else now
+        if self._last_request is not None and now - self._last_request <= debounce_time:
+            return False
+        self._last_request = now
+        return True
+
+    async def wait_awake(self) -> bool:
+        """ Wait for the next advertisement if the board is not in its wake window, False on timeout """
+        if self.is_awake():
+            return True
+        self._advertised.clear()
+        try:
+            await asyncio.wait_for(self._advertised.wait(), self.max_wait)
+        except asyncio.TimeoutError:
+            return False
+        return True
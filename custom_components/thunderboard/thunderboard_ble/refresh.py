@@ -0,0 +1,93 @@
+"""
+Per characteristic refresh schedule of the Thunderboard Sense 2 values read on each poll.
+"""
+from __future__ import annotations
+
+import time
+from typing import Iterable, Optional
+
+# Read on every poll
+REFRESH_EVERY_POLL = 0.0
+# Read only when the value is unknown or was invalidated, e.g. the LEDs only change from our own writes
+REFRESH_ON_CHANGE = None
+
+# Maximum age in seconds of each value before it's read again, keys not listed are read on every poll
+THUNDERBOARD_REFRESH_POLICIES: dict[str, Optional[float]] = {
+    "battery": 3600.0,
+    "power_source": 3600.0,
+    "temperature": 120.0,
+    "humidity": 120.0,
+    "pressure": 120.0,
+    "uv_idx": 120.0,
+    "sound_level": REFRESH_EVERY_POLL,
+    "ambient_light": REFRESH_EVERY_POLL,
+    "hall_field_strenght": REFRESH_EVERY_POLL,
+    "digital_state_0": REFRESH_EVERY_POLL,
+    "digital_state_1": REFRESH_EVERY_POLL,
+    "rgb_leds_1": REFRESH_ON_CHANGE,
+}
+
+
+class ThunderboardRefreshSchedule:
+    """Keep when each value was last read and tell which ones are due on the next poll."""
+
+    def __init__(self, policies: Optional[dict[str, Optional[float]]] = None):
+        super().__init__()
+        self.policies = {**THUNDERBOARD_REFRESH_POLICIES, **(policies or {})}
+        # Shorter maximum ages set from outside, like the adaptive polling interval
+        self._caps: dict[str, float] = {}
+        self._read_at: dict[str, float] = {}
+        self.due_reads = 0
+        self.skipped_reads = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"due_reads": self.due_reads, "skipped_reads": self.skipped_reads}
+
+    def get_max_age(self, key: str) -> Optional[float]:
+        """ Seconds between two reads of the key, None when it's only read on change """
+        key = str(key)
+        max_age = self.policies.get(key, REFRESH_EVERY_POLL)
+        if max_age is REFRESH_ON_CHANGE:
+            return None
+        return min(max_age, self._caps.get(key, max_age))
+
+    def is_due(self, key: str, now: Optional[float] = None) -> bool:
+        key = str(key)
+        if key not in self._read_at:
+            return True
+        max_age = self.get_max_age(key)
+        if max_age is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self._read_at[key] >= max_age
+
+    def select(self, keys: Iterable[str], now: Optional[float] = None) -> list[str]:
+        """ Get the keys due now, in the given order, and count the skipped reads """
+        now = time.monotonic() if now is None else now
+        keys = list(keys)
+        due = [key for key in keys if self.is_due(key, now)]
+        self.due_reads += len(due)
+        self.skipped_reads += len(keys) - len(due)
+        return due
+
+    def cap_max_age(self, keys: Iterable[str], max_age: Optional[float]) -> None:
+        """ Read the keys at least every max_age seconds, None goes back to their policies """
+        for key in keys:
+            if max_age is None:
+                self._caps.pop(str(key), None)
+            else:
+                self._caps[str(key)] = max_age
+
+    def mark_read(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        for key in keys:
+            self._read_at[str(key)] = now
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        """ Read again the keys on the next poll, all of them when not given """
+        if keys is None:
+            self._read_at.clear()
+            return
+        for key in keys:
+            self._read_at.pop(str(key), None)
@@ -0,0 +1,80 @@
+"""
+Signal strength of a Thunderboard Sense 2 smoothed from its advertisements, by adapter or proxy.
+"""
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import Any, Optional
+
+# Weight of the last advertisement in the smoothed RSSI
+SIGNAL_SMOOTHING = 0.25
+# An adapter that didn't see the board for this long no longer counts
+SOURCE_TIMEOUT = 300.0
+# Connections to a board weaker than this usually time out, see ThunderboardSignalTracker.min_rssi
+DEFAULT_MIN_RSSI = -95
+
+
+@dataclasses.dataclass
+class _SourceSignal:
+    rssi: float
+    seen_at: float
+
+
+class ThunderboardSignalTracker:
+    """Smooth the RSSI of the advertisements seen by each adapter, to choose if and through which one to connect."""
+
+    def __init__(self, min_rssi: Optional[float] = DEFAULT_MIN_RSSI, smoothing: float = SIGNAL_SMOOTHING):
+        super().__init__()
+        self.min_rssi = min_rssi
+        self.smoothing = smoothing
+        self.skipped = 0
+        self._sources: dict[Optional[str], _SourceSignal] = {}
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rssi": self.rssi,
+            "best_source": self.best_source,
+            "min_rssi": self.min_rssi,
+            "skipped": self.skipped,
+            "sources": {str(source): round(signal.rssi, 1) for source, signal in self._sources.items()},
+        }
+
+    def record(self, rssi: Optional[int], source: Optional[str] = None, now: Optional[float] = None) -> None:
+        if rssi is None:
+            return
+        now = time.monotonic() if now is None else now
+        signal = self._sources.get(source)
+        if signal is None or now - signal.seen_at > SOURCE_TIMEOUT:
+            self._sources[source] = _SourceSignal(float(rssi), now)
+            return
+        signal.rssi += self.smoothing * (rssi - signal.rssi)
+        signal.seen_at = now
+
+    def _fresh(self, now: Optional[float] = None) -> dict[Optional[str], _SourceSignal]:
+        now = time.monotonic() if now is None else now
+        return {source: signal for source, signal in self._sources.items() if now - signal.seen_at <= SOURCE_TIMEOUT}
+
+    @property
+    def best_source(self) -> Optional[str]:
+        fresh = self._fresh()
+        return max(fresh, key=lambda source: fresh[source].rssi) if fresh else None
+
+    @property
+    def rssi(self) -> Optional[int]:
+        """ Smoothed RSSI of the adapter with the best signal, None when no adapter saw the board recently """
+        fresh = self._fresh()
+        return round(max(signal.rssi for signal in fresh.values())) if fresh else None
+
+    def get_rssi(self, source: Optional[str], default: Optional[float] = None) -> Optional[float]:
+        signal = self._fresh().get(source)
+        return signal.rssi if signal is not None else default
+
+    def should_connect(self) -> bool:
+        """ Skip the connections while the smoothed signal is below the floor, an unknown signal is tried """
+        rssi = self.rssi
+        if self.min_rssi is None or rssi is None or rssi >= self.min_rssi:
+            return True
+        self.skipped += 1
+        return False
@@ -0,0 +1,217 @@
+"""
+Polling scheduler shared by all the Thunderboard Sense 2 devices, staggered and limited per adapter.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections established or in use at the same time on an adapter, ESPHome proxies have 3 slots
+DEFAULT_ADAPTER_SLOTS = 2
+# Phases spread by the golden ratio stay apart whatever the number of devices registered
+PHASE_RATIO = (math.sqrt(5) - 1) / 2
+
+
+@dataclasses.dataclass
+class _ScheduledDevice:
+    address: str
+    interval: float
+    refresh: Callable[[], Awaitable[Any]]
+    phase: float
+    due: float
+    adapter: Optional[str] = None
+    running: bool = False
+    runs: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "adapter": self.adapter,
+            "interval": self.interval,
+            "phase": round(self.phase, 3),
+            "runs": self.runs,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": self.total_lag / self.runs if self.runs else 0.0,
+        }
+
+
+@dataclasses.dataclass
+class _AdapterSlots:
+    in_use: int = 0
+    waiters: list[tuple[float, int, asyncio.Future]] = dataclasses.field(default_factory=list)
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, waiter in self.waiters if not waiter.done())
+
+
+class ThunderboardPollScheduler:
+    """Poll the registered devices at staggered phases, with a bounded number of connections per adapter."""
+
+    def __init__(
+        self,
+        logger: logging.Logger = _LOGGER,
+        adapter_slots: int = DEFAULT_ADAPTER_SLOTS,
+        create_task: Optional[Callable[[Coroutine[Any, Any, Any], str], asyncio.Task]] = None,
+    ):
+        super().__init__()
+        self.logger = logger
+        self.adapter_slots = adapter_slots
+        # Creates the scheduler and refresh tasks with a name, like hass.async_create_background_task
+        self._create_task = create_task or (lambda coro, name: asyncio.get_running_loop().create_task(coro, name=name))
+        self._devices: dict[str, _ScheduledDevice] = {}
+        self._adapters: dict[Optional[str], _AdapterSlots] = {}
+        self._sequence = itertools.count()
+        self._phases = itertools.count()
+        self._epoch = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._refreshes: set[asyncio.Task] = set()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "devices": {address: device.stats for address, device in self._devices.items()},
+            "adapters": {
+                str(adapter): {"in_use": slots.in_use, "waiting": slots.waiting}
+                for adapter, slots in self._adapters.items()
+            },
+        }
+
+    def get_lag(self, address: str) -> Optional[float]:
+        """ Seconds between the last scheduled time of the device and the start of its refresh """
+        device = self._devices.get(address)
+        return device.last_lag if device else None
+
+    def _next_due(self, device: _ScheduledDevice, now: float) -> float:
+        # Keep the phase of the device, skip the runs missed while it was busy
+        start = self._epoch + device.phase
+        return start + device.interval * (math.floor((now - start) / device.interval) + 1)
+
+    def register(
+        self,
+        address: str,
+        interval: float,
+        refresh: Callable[[], Awaitable[Any]],
+        adapter: Optional[str] = None,
+    ) -> Callable[[], None]:
+        """ Poll the device every interval, return the function removing it """
+        phase = (next(self._phases) * PHASE_RATIO % 1) * interval
+        device = _ScheduledDevice(address, interval, refresh, phase, 0.0, adapter)
+        device.due = self._next_due(device, time.monotonic())
+        self._devices[address] = device
+        self.logger.debug("Schedule %s every %ss with a phase of %.1fs", address, interval, phase)
+        if self._task is None or self._task.done():
+            self._task = self._create_task(self._run(), "thunderboard poll scheduler")
+        self._wakeup.set()
+        return lambda: self.unregister(address, device)
+
+    def unregister(self, address: str, device: Optional[_ScheduledDevice] = None) -> None:
+        # A reloaded entry registers again before the old one is removed, keep the new one then
+        if device is None or self._devices.get(address) is device:
+            self._devices.pop(address, None)
+            self._wakeup.set()
+
+    def set_interval(self, address: str, interval: float) -> None:
+        """ Change the polling interval of the device, its phase is scaled to the new interval """
+        device = self._devices.get(address)
+        if device is None or device.interval == interval:
+            return
+        device.phase = device.phase / device.interval * interval
+        device.interval = interval
+        if not device.running:
+            device.due = self._next_due(device, time.monotonic())
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        self._devices.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @asynccontextmanager
+    async def slot(self, address: str, adapter: Optional[str] = None) -> AsyncIterator[None]:
+        """ Wait for a connection slot on the adapter of the device, the earliest scheduled device goes first """
+        device = self._devices.get(address)
+        if device is not None and adapter is not None:
+            device.adapter = adapter
+        elif device is not None:
+            adapter = device.adapter
+        scheduled = device is not None and device.running
+        due = device.due if scheduled else time.monotonic()
+        slots = self._adapters.setdefault(adapter, _AdapterSlots())
+        if slots.in_use < self.adapter_slots and not slots.waiting:
+            slots.in_use += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(slots.waiters, (due, next(self._sequence), waiter))
+            try:
+                # The slot is handed over by _release, in_use is already counted
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release(slots)
+                raise
+        if scheduled:
+            lag = max(0.0, time.monotonic() - due)
+            device.runs += 1
+            device.last_lag = lag
+            device.max_lag = max(device.max_lag, lag)
+            device.total_lag += lag
+        try:
+            yield
+        finally:
+            self._release(slots)
+
+    def _release(self, slots: _AdapterSlots) -> None:
+        while slots.waiters:
+            _, _, waiter = heapq.heappop(slots.waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        slots.in_use -= 1
+
+    async def _refresh(self, device: _ScheduledDevice) -> None:
+        try:
+            await device.refresh()
+        except Exception as err:
+            self.logger.debug("Scheduled refresh of %s failed: %s", device.address, err)
+        finally:
+            device.running = False
+            device.due = self._next_due(device, time.monotonic())
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while self._devices:
+            now = time.monotonic()
+            for device in list(self._devices.values()):
+                if not device.running and device.due <= now:
+                    device.running = True
+                    task = self._create_task(self._refresh(device), f"thunderboard poll {device.address}")
+                    self._refreshes.add(task)
+                    task.add_done_callback(self._refreshes.discard)
+            next_due = min((device.due for device in self._devices.values() if not device.running), default=None)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), None if next_due is None else max(0.0, next_due - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,143 @@
+"""
+Device session multiplexing polling, lights and notifications over one Thunderboard Sense 2 connection.
+"""
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Iterable, Optional
+
+from bleak import BleakClient, BleakError
+
+from .lights import ThunderboardLightsController
+from .pipeline import ThunderboardGattPipeline, ThunderboardOperationPriority, get_max_in_flight
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ThunderboardDeviceSession:
+    """All the GATT operations of a device, queued by priority on its current connection."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        max_in_flight: int | None = None,
+    ):
+        super().__init__()
+        self.logger = logger
+        self._max_in_flight = max_in_flight
+        self._pipeline: Optional[ThunderboardGattPipeline] = None
+        self._lights_controller: Optional[ThunderboardLightsController] = None
+        # Active notifications by characteristic handle, subscribed again on a new connection
+        self._subscriptions: dict[Any, tuple[Any, Callable, dict]] = {}
+        self._subscribed_client: Optional[BleakClient] = None
+        # Leases a connection for the operations sent while detached, without one they fail
+        self.connector: Optional[Callable[[], AsyncContextManager[None]]] = None
+
+    @property
+    def client(self) -> Optional[BleakClient]:
+        return self._pipeline.client if self._pipeline else None
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    @property
+    def address(self) -> str:
+        return self.client.address
+
+    @property
+    def services(self):
+        return self.client.services
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return self._pipeline.stats if self._pipeline else {}
+
+    @property
+    def needs_resubscribe(self) -> bool:
+        """ The notifications were subscribed on a previous connection """
+        return bool(self._subscriptions) and self._subscribed_client is not self.client
+
+    def attach(self, client: BleakClient) -> None:
+        """ Use the client for the next operations, the queue and its stats are kept on reconnect """
+        if self._pipeline is None:
+            self._pipeline = ThunderboardGattPipeline(client, self._max_in_flight)
+        else:
+            self._pipeline.client = client
+            self._pipeline.max_in_flight = self._max_in_flight or get_max_in_flight(client)
+
+    def detach(self) -> None:
+        if self._pipeline is not None:
+            self._pipeline.client = None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[None]:
+        """ Keep a connection attached while the operations inside run, leased through the connector if any """
+        if self.connector is None:
+            yield
+            return
+        async with self.connector():
+            yield
+
+    def _get_pipeline(self) -> ThunderboardGattPipeline:
+        if not self.connected:
+            raise BleakError("Thunderboard device session is not connected")
+        return self._pipeline
+
+    async def read_gatt_char(
+        self,
+        char_specifier: Any,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.USER,
+        **kwargs
+    ) -> bytearray:
+        return await self._get_pipeline().read_gatt_char(char_specifier, priority, **kwargs)
+
+    async def write_gatt_char(
+        self,
+        char_specifier: Any,
+        data: bytes,
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.USER,
+        **kwargs
+    ) -> None:
+        await self._get_pipeline().write_gatt_char(char_specifier, data, priority, **kwargs)
+
+    async def start_notify(self, char_specifier: Any, callback, **kwargs) -> None:
+        await self._get_pipeline().start_notify(char_specifier, callback, **kwargs)
+        self._subscriptions[getattr(char_specifier, "handle", char_specifier)] = (char_specifier, callback, kwargs)
+        self._subscribed_client = self.client
+
+    async def stop_notify(self, char_specifier: Any) -> None:
+        self._subscriptions.pop(getattr(char_specifier, "handle", char_specifier), None)
+        await self._get_pipeline().stop_notify(char_specifier)
+
+    @property
+    def subscriptions(self) -> set[Any]:
+        """ The handles, or specifiers, of the active notifications """
+        return set(self._subscriptions)
+
+    async def resubscribe(self, keys: Optional[Iterable[Any]] = None) -> int:
+        """ Subscribe again on the current connection to the active notifications, or only to keys, return their count """
+        subscriptions = self._subscriptions if keys is None else {
+            key: self._subscriptions[key] for key in keys if key in self._subscriptions
+        }
+        for key, (char_specifier, callback, kwargs) in list(subscriptions.items()):
+            # The characteristics of the previous connection belong to its services
+            char = self.services.get_characteristic(key) if isinstance(key, int) else None
+            await self._get_pipeline().start_notify(char or char_specifier, callback, **kwargs)
+        self._subscribed_client = self.client
+        self.logger.debug("Subscribed again to %d notifications", len(subscriptions))
+        return len(subscriptions)
+
+    async def read_many(
+        self,
+        char_specifiers: Iterable[Any],
+        priority: ThunderboardOperationPriority = ThunderboardOperationPriority.POLL,
+    ) -> list[bytearray]:
+        return await self._get_pipeline().read_many(char_specifiers, priority)
+
+    def lights_controller(self) -> ThunderboardLightsController:
+        """ Get the lights controller, its commands go through the session with user priority """
+        if self._lights_controller is None:
+            self._lights_controller = ThunderboardLightsController(self.logger, self)
+        return self._lights_controller
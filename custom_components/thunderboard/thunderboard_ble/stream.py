@@ -0,0 +1,80 @@
+"""
+Bounded buffering of the values streamed from Thunderboard Sense 2 notifications and timed reads.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+
+from sensor_state_data.enum import StrEnum
+
+from .models import ThunderboardReading
+
+DEFAULT_STREAM_BUFFER_SIZE = 64
+DEFAULT_STREAM_READ_INTERVAL = 5.0
+
+
+class ThunderboardStreamOverflow(StrEnum):
+    # Discard the oldest buffered reading to make room for the new one
+    DROP_OLDEST = "drop_oldest"
+    # Discard the new reading, the buffered ones are kept
+    DROP_NEWEST = "drop_newest"
+    # Keep only the latest reading of each key, older ones are replaced in place
+    LATEST_PER_KEY = "latest_per_key"
+
+
+class ThunderboardReadingBuffer:
+    """Readings waiting for the consumer, never more than the buffer size."""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_STREAM_BUFFER_SIZE,
+        overflow: ThunderboardStreamOverflow = ThunderboardStreamOverflow.DROP_OLDEST,
+    ):
+        super().__init__()
+        self.size = size
+        self.overflow = overflow
+        self._readings: deque[ThunderboardReading] = deque()
+        self._latest: OrderedDict[str, ThunderboardReading] = OrderedDict()
+        self._available = asyncio.Event()
+        self.received = 0
+        self.dropped = 0
+        self._error: Exception | None = None
+
+    def __len__(self) -> int:
+        return len(self._latest) if self.overflow == ThunderboardStreamOverflow.LATEST_PER_KEY else len(self._readings)
+
+    def put(self, reading: ThunderboardReading) -> None:
+        """ Add a reading without waiting, it's called from the notification callbacks """
+        self.received += 1
+        if self.overflow == ThunderboardStreamOverflow.LATEST_PER_KEY:
+            if reading.key in self._latest:
+                self.dropped += 1
+            elif len(self._latest) >= self.size:
+                self._latest.popitem(last=False)
+                self.dropped += 1
+            self._latest[reading.key] = reading
+        elif len(self._readings) >= self.size:
+            self.dropped += 1
+            if self.overflow == ThunderboardStreamOverflow.DROP_NEWEST:
+                return
+            self._readings.popleft()
+            self._readings.append(reading)
+        else:
+            self._readings.append(reading)
+        self._available.set()
+
+    def fail(self, error: Exception) -> None:
+        """ Wake up the consumer with the error once the buffered readings are consumed """
+        self._error = error
+        self._available.set()
+
+    async def get(self) -> ThunderboardReading:
+        while not len(self):
+            if self._error is not None:
+                raise self._error
+            self._available.clear()
+            await self._available.wait()
+        if self.overflow == ThunderboardStreamOverflow.LATEST_PER_KEY:
+            return self._latest.popitem(last=False)[1]
+        return self._readings.popleft()
@@ -0,0 +1,103 @@
+"""
+Reconnection of a Thunderboard Sense 2 kept connected, so its notifications are received again after a disconnect.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wait before the first reconnection, doubled on each failed one up to the maximum
+DEFAULT_RECONNECT_BACKOFF = 1.0
+DEFAULT_MAX_RECONNECT_BACKOFF = 300.0
+# Each wait is randomly shortened by up to this ratio, so the boards dropped together don't reconnect together
+RECONNECT_JITTER = 0.5
+# Downtimes kept for the diagnostics
+DOWNTIME_HISTORY = 10
+
+
+class ThunderboardReconnectSupervisor:
+    """Reconnect after an unexpected disconnect with a jittered exponential backoff.
+
+    The reconnect function connects, subscribes again and reads the state once, it raises when it failed.
+    """
+
+    def __init__(
+        self,
+        reconnect: Callable[[], Awaitable[Any]],
+        logger: logging.Logger = _LOGGER,
+        backoff: float = DEFAULT_RECONNECT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_RECONNECT_BACKOFF,
+        jitter: float = RECONNECT_JITTER,
+    ):
+        super().__init__()
+        self.logger = logger
+        self._reconnect = reconnect
+        self.backoff = backoff
+        self.max_backoff = max(backoff, max_backoff)
+        self.jitter = jitter
+        self.disconnects = 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.total_downtime = 0.0
+        self._downtimes: deque[float] = deque(maxlen=DOWNTIME_HISTORY)
+        self._disconnected_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "total_downtime": self.total_downtime,
+            "last_downtimes": list(self._downtimes),
+            "down_for": time.monotonic() - self._disconnected_at if self._disconnected_at is not None else None,
+        }
+
+    def _get_delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay * (1 - random.uniform(0, self.jitter))
+
+    def handle_disconnect(self) -> None:
+        """ Start reconnecting, to be called from the disconnected callback of the client """
+        if self._stopped or (self._task is not None and not self._task.done()):
+            return
+        self.disconnects += 1
+        self._disconnected_at = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        attempt = 0
+        while not self._stopped:
+            await asyncio.sleep(self._get_delay(attempt))
+            try:
+                await self._reconnect()
+            except Exception as err:
+                self.failed_attempts += 1
+                attempt += 1
+                self.logger.debug("Reconnection attempt %d failed: %s", attempt, err)
+                continue
+            downtime = time.monotonic() - self._disconnected_at
+            self._downtimes.append(downtime)
+            self.total_downtime += downtime
+            self.reconnects += 1
+            self._disconnected_at = None
+            self.logger.debug("Reconnected after %.1fs and %d failed attempts", downtime, attempt)
+            return
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None